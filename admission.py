@@ -0,0 +1,144 @@
+import os
+import time
+import asyncio
+
+
+def read_loadavg():
+    """
+    读取 /proc/loadavg 的 1 分钟平均负载
+    """
+    with open("/proc/loadavg", "r") as f:
+        return float(f.read().split()[0])
+
+
+def read_mem_available():
+    """
+    读取 /proc/meminfo 中的 MemAvailable（字节）
+    """
+    with open("/proc/meminfo", "r") as f:
+        for line in f:
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) * 1024
+    raise ValueError("MemAvailable not found in /proc/meminfo")
+
+
+def process_tree_rss(pid):
+    """
+    统计进程及其全部子孙进程的 RSS 之和（字节），进程已退出时返回 0
+    """
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f"/proc/{current}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+            with open(f"/proc/{current}/task/{current}/children", "r") as f:
+                stack.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+class AdmissionController:
+    """
+    仿真准入控制：根据主机负载、可用内存和按模式学习到的峰值 RSS 决定是否启动新的 make ncrun
+    在 --parallel 上限之内进一步限流，避免共享主机超载或 OOM
+    """
+
+    POLL_INTERVAL = 2.0    # 无余量时的重试间隔（秒）
+    SAMPLE_INTERVAL = 2.0  # 运行中 RSS 采样间隔（秒）
+    LOAD_SETTLE = 60.0     # 仍在运行且启动不足该时间的仿真额外计入负载（1 分钟 loadavg 存在滞后）
+
+    def __init__(self, gconf, runtime_db):
+        """
+        :param gconf: GConf 实例
+        :param runtime_db: RuntimeDB 实例，用于读取/记录历史峰值 RSS
+        """
+        self.logger = gconf.logger
+        self.runtime_db = runtime_db
+        self.load_limit = gconf.max_load * (os.cpu_count() or 1)
+        self.mem_reserve = gconf.mem_reserve_mb * 1024 * 1024
+
+        self.peak_rss = {}   # mode -> 已知峰值 RSS（字节）
+        self.running = {}    # ticket -> {"mode", "rss", "peak", "started", "sampled_at"}
+        self._next_ticket = 0
+        self._lock = asyncio.Lock()
+        self._released = asyncio.Event()  # 有仿真结束时提前唤醒等待中的准入检查
+
+    def _estimate_rss(self, mode):
+        """
+        预估某模式单次仿真的峰值 RSS，未知模式使用所有模式中的最大值
+        """
+        if mode not in self.peak_rss:
+            self.peak_rss[mode] = self.runtime_db.mode_peak_rss(mode)
+        return self.peak_rss[mode] or max(self.peak_rss.values(), default=0)
+
+    def _has_headroom(self, mode):
+        """
+        判断当前是否有足够余量启动一次新仿真
+        """
+        now = time.monotonic()
+        recent = sum(1 for run in self.running.values() if now - run["started"] < self.LOAD_SETTLE)
+        load = read_loadavg() + recent
+        if load + 1 > self.load_limit:
+            return False, f"load {load:.1f} / limit {self.load_limit:.1f}"
+
+        # 已启动但尚未达到峰值的仿真，其剩余内存需求也要预留
+        pending = sum(max(0, self._estimate_rss(run["mode"]) - run["rss"]) for run in self.running.values())
+        available = read_mem_available() - self.mem_reserve - pending
+        needed = self._estimate_rss(mode)
+        if needed > available:
+            return False, f"memory need {needed >> 20}MB, available {max(available, 0) >> 20}MB"
+        return True, ""
+
+    async def acquire(self, mode):
+        """
+        等待直到有余量启动新仿真；没有运行中的仿真时总是放行，避免死锁
+        :return: 准入凭据，运行结束后须调用 release()
+        """
+        async with self._lock:
+            waiting_reason = None
+            while self.running:
+                ok, reason = self._has_headroom(mode)
+                if ok:
+                    break
+                if reason != waiting_reason:
+                    self.logger.debug(f"Admission control holding {mode} run: {reason}")
+                    waiting_reason = reason
+                self._released.clear()
+                try:
+                    await asyncio.wait_for(self._released.wait(), self.POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+            self._next_ticket += 1
+            ticket = self._next_ticket
+            self.running[ticket] = {"mode": mode, "rss": 0, "peak": 0, "started": time.monotonic(), "sampled_at": 0.0}
+            return ticket
+
+    def sample(self, ticket, pid):
+        """
+        采样运行中仿真的进程树 RSS（按 SAMPLE_INTERVAL 限频）
+        """
+        run = self.running.get(ticket)
+        now = time.monotonic()
+        if run is None or now - run["sampled_at"] < self.SAMPLE_INTERVAL:
+            return
+        run["sampled_at"] = now
+        run["rss"] = process_tree_rss(pid)
+        run["peak"] = max(run["peak"], run["rss"])
+
+    def release(self, ticket):
+        """
+        仿真结束，更新该模式的峰值 RSS 估计
+        :return: 本次运行观测到的峰值 RSS（字节）
+        """
+        run = self.running.pop(ticket)
+        mode = run["mode"]
+        self.peak_rss[mode] = max(self.peak_rss.get(mode, 0), run["peak"])
+        self._released.set()
+        return run["peak"]
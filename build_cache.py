@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+
+class BuildCache:
+    """
+    编译缓存管理，按 mode / wave / ccov / Makefile / 源文件指纹索引已编译的 exec 目录
+    命中时复制恢复 exec 目录，跳过 make cmp；缓存总大小超过上限时按最近使用时间淘汰
+    缓存项与回归目录不共享 inode：仿真阶段原地修改 exec 中的文件（例如覆盖率数据库）不会破坏缓存
+    """
+
+    DONE_MARKER = ".cache_done"
+
+    def __init__(self, gconf):
+        """
+        :param gconf: GConf 实例
+        """
+        self.gconf = gconf
+        self.logger = gconf.logger
+        self.cache_dir = os.path.join(gconf.base_dir, "build_cache")
+        self.max_bytes = int(gconf.build_cache_max_gb * 1024 ** 3)  # 0 表示不限制
+        self.src_dirs = gconf.src_dirs
+        self._fingerprint = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _hash_file(path, hasher):
+        """
+        将文件内容分块写入哈希
+        """
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hasher.update(chunk)
+
+    def source_fingerprint(self):
+        """
+        计算 DUT/TB 源文件指纹（相对路径 + 文件内容），同一次回归内只计算一次
+        """
+        with self._lock:
+            if self._fingerprint is not None:
+                return self._fingerprint
+
+            hasher = hashlib.sha256()
+            for src in sorted(self.src_dirs):
+                hasher.update(f"src:{src}\n".encode())
+                if os.path.isfile(src):
+                    self._hash_file(src, hasher)
+                elif os.path.isdir(src):
+                    for root, dirs, files in os.walk(src):
+                        dirs.sort()
+                        for name in sorted(files):
+                            path = os.path.join(root, name)
+                            hasher.update(f"file:{os.path.relpath(path, src)}\n".encode())
+                            self._hash_file(path, hasher)
+                else:
+                    self.logger.warning(f"Build cache source path not found: {src}")
+                    hasher.update(b"missing\n")
+
+            self._fingerprint = hasher.hexdigest()
+            self.logger.info(f"Source fingerprint: {self._fingerprint}")
+            return self._fingerprint
+
+    def make_key(self, mode, wave, ccov):
+        """
+        生成编译缓存键
+        :return: 缓存键（十六进制字符串）
+        """
+        makefile_hash = hashlib.sha256()
+        self._hash_file(os.path.join(self.gconf.result_path, "Makefile"), makefile_hash)
+        key_fields = {
+            "mode": mode,
+            "wave": wave,
+            "ccov": ccov,
+            "makefile": makefile_hash.hexdigest(),
+            "sources": self.source_fingerprint(),
+        }
+        return hashlib.sha256(json.dumps(key_fields, sort_keys=True).encode()).hexdigest()
+
+    def restore(self, key, exec_dir):
+        """
+        缓存命中时将缓存的 exec 目录复制到回归目录，并刷新缓存项的最近使用时间
+        :return: 是否命中；复制过程中缓存项被其他回归淘汰时视为未命中
+        """
+        cached_exec = os.path.join(self.cache_dir, key, "exec")
+        marker = os.path.join(self.cache_dir, key, self.DONE_MARKER)
+        if not os.path.exists(marker):
+            return False
+
+        if os.path.exists(exec_dir):
+            shutil.rmtree(exec_dir)
+        try:
+            os.utime(marker)
+            shutil.copytree(cached_exec, exec_dir, symlinks=True)
+        except (OSError, shutil.Error) as e:
+            self.logger.warning(f"Failed to restore build cache entry {key}: {e}")
+            shutil.rmtree(exec_dir, ignore_errors=True)
+            return False
+        self.logger.info(f"Build cache hit: {key} -> {exec_dir}")
+        return True
+
+    def store(self, key, exec_dir):
+        """
+        将编译结果写入缓存（先写临时目录再原子重命名，避免并发回归读到半成品）
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        if os.path.exists(entry_dir):
+            return
+
+        tmp_dir = f"{entry_dir}.tmp.{os.getpid()}.{threading.get_ident()}"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            shutil.copytree(exec_dir, os.path.join(tmp_dir, "exec"), symlinks=True)
+            open(os.path.join(tmp_dir, self.DONE_MARKER), "w").close()
+            os.rename(tmp_dir, entry_dir)
+            self.logger.info(f"Stored build cache entry: {entry_dir}")
+        except (OSError, shutil.Error) as e:
+            # 另一个回归可能已写入同一缓存项
+            self.logger.warning(f"Failed to store build cache entry {entry_dir}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.evict(keep=key)
+
+    @staticmethod
+    def _dir_size(path):
+        total = 0
+        for root, dirs, files in os.walk(path):
+            for name in files:
+                try:
+                    total += os.lstat(os.path.join(root, name)).st_size
+                except OSError:
+                    continue
+        return total
+
+    def evict(self, keep=None):
+        """
+        缓存总大小超过上限时，按最近使用时间（完成标记的 mtime）从旧到新删除缓存项
+        先重命名再删除，避免其他回归命中删除了一半的缓存项
+        :param keep: 不淘汰的缓存键（刚写入的缓存项）
+        """
+        if not self.max_bytes:
+            return
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if "." in name:
+                    continue  # 写入中的临时目录或正在删除的缓存项
+                marker = os.path.join(self.cache_dir, name, self.DONE_MARKER)
+                try:
+                    entries.append((os.path.getmtime(marker), name, self._dir_size(os.path.join(self.cache_dir, name))))
+                except OSError:
+                    continue  # 已被其他回归淘汰
+
+            total = sum(size for _, _, size in entries)
+            for _, name, size in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if name == keep:
+                    continue
+                entry_dir = os.path.join(self.cache_dir, name)
+                evicted_dir = f"{entry_dir}.evict.{os.getpid()}.{time.monotonic_ns()}"
+                try:
+                    os.rename(entry_dir, evicted_dir)
+                except OSError:
+                    continue  # 已被其他回归淘汰
+                shutil.rmtree(evicted_dir, ignore_errors=True)
+                total -= size
+                self.logger.info(f"Evicted build cache entry: {name} ({size / 1024 ** 2:.1f} MB)")
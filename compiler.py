@@ -1,11 +1,17 @@
 import os
+import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from build_cache import BuildCache
+from utils import kill_process_group
 
 class Compiler:
     """
     编译管理模块
     """
 
+    DONE_MARKER = ".cmp_done"  # 镜像编译成功（或由编译缓存恢复）后写入 exec 目录，--resume 据此跳过已完成的编译
+
     def __init__(self, gconf):
         """
         :param gconf: GConf 实例
@@ -13,42 +19,149 @@ class Compiler:
         self.gconf = gconf
         self.logger = gconf.logger
 
-    def compile_mode(self, mode):
-        self.logger.info(f"Compiling mode: {mode}...")
+        # 编译输出逐行匹配的错误关键字与致命错误模式
+        self.err_regex = re.compile(gconf.err_keyword)
+        self.fatal_regex = re.compile(gconf.cmp_fatal_keyword)
+
+        # 编译缓存：未配置 SRC_DIRS 时无法判断源文件是否变化，因此不启用
+        self.build_cache = None
+        if gconf.no_build_cache:
+            self.logger.info("Build cache disabled by --no_build_cache.")
+        elif not gconf.src_dirs:
+            self.logger.warning("SRC_DIRS is not configured in regress_cfg, build cache disabled.")
+        else:
+            self.build_cache = BuildCache(gconf)
+
+    def _mark_done(self, exec_dir):
+        """
+        在 exec 目录中写入编译完成标记（Makefile 未创建 exec 目录时一并创建）
+        """
+        os.makedirs(exec_dir, exist_ok=True)
+        open(os.path.join(exec_dir, self.DONE_MARKER), "w").close()
+
+    def compile_mode(self, mode, ccov=None, wave=None):
+        """
+        编译一个模式的一个镜像
+        :param mode: 模式名称
+        :param ccov: 覆盖率开关，默认使用 gconf.ccov（主镜像）；其他取值编译到额外镜像（make 变量 build）
+        :param wave: 波形开关，默认使用 gconf.cmp_wave（主镜像）；on 时编译自动波形重跑使用的波形镜像
+        """
+        ccov = ccov or self.gconf.ccov
+        wave = self.gconf.build_wave(ccov, wave)
+        build = self.gconf.build_name(ccov, wave)
+        suffix = f"_{build}" if build else ""
+        target = f"{mode} (build: {build})" if build else mode
+        self.logger.info(f"Compiling mode: {target}...")
 
         # 准备目录结构
         result_mode_dir = os.path.join(self.gconf.result_path, mode)
         log_dir = os.path.join(result_mode_dir, "log")
         os.makedirs(log_dir, exist_ok=True)
-        log_path = os.path.join(log_dir, "cmp.log")
+        log_path = os.path.join(log_dir, f"cmp{suffix}.log")
+        # make 的输出单独写入 cmp<suffix>.stream.log：cmp<suffix>.log 由 Makefile 自身写入，保证每个文件只有一个写者
+        stream_path = os.path.join(log_dir, f"cmp{suffix}.stream.log")
+        exec_dir = os.path.join(result_mode_dir, f"exec{suffix}")
+        done_marker = os.path.join(exec_dir, self.DONE_MARKER)
 
-        self.logger.info(f"[DEBUG] Log path: {log_path}")
+        # 续跑时复用中断前已编译完成的镜像；Makefile 在编译失败时同样会创建 exec 目录，因此以完成标记为准
+        if self.gconf.resume and os.path.exists(done_marker):
+            self.logger.info(f"Compilation skipped for mode: {target} (already compiled before resume)")
+            return
+        if os.path.exists(done_marker):
+            os.remove(done_marker)
+
+        # 命中编译缓存时直接复用 exec 目录
+        cache_key = None
+        if self.build_cache:
+            cache_key = self.build_cache.make_key(mode, wave, ccov)
+            if self.build_cache.restore(cache_key, exec_dir):
+                with open(log_path, "w") as log_file:
+                    log_file.write(f"[INFO] Build cache hit for mode {target}, key: {cache_key}\n")
+                self._mark_done(exec_dir)
+                self.logger.info(f"Compilation skipped for mode: {target} (build cache hit)")
+                return
 
         try:
-            # 调用 Makefile
-            process = subprocess.run(
-                ["make", "cmp", f"mode={mode}", f"wave={self.gconf.wave}", f"ccov={self.gconf.ccov}"],
+            # 调用 Makefile，独立进程组便于致命错误时整组终止
+            cmd = ["make", "cmp", f"mode={mode}", f"wave={wave}", f"ccov={ccov}"]
+            if build:
+                cmd.append(f"build={build}")
+            process = subprocess.Popen(
+                cmd,
                 cwd=self.gconf.result_path,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True  # 以文本形式解码输出
+                text=True,  # 以文本形式解码输出
+                errors="replace",
+                start_new_session=True
             )
 
-            # 实时打印 Makefile 输出
-            make_output = process.stdout
-            print(make_output)
+            # 逐行写入 stream 日志并实时打印，内存占用与输出大小无关
+            first_error = None
+            fatal_line = None
+            with open(stream_path, "w") as log_file:
+                for line in process.stdout:
+                    log_file.write(line)
+                    print(f"[{mode}{suffix}] {line}", end="")
+
+                    if first_error is None and self.err_regex.search(line):
+                        first_error = line.strip()
+                    if self.gconf.cmp_abort_on_fatal and self.fatal_regex.search(line):
+                        fatal_line = line.strip()
+                        self.logger.error(f"Fatal pattern in compilation of mode {target}, aborting: {fatal_line}")
+                        kill_process_group(process)
+                        break
+            process.stdout.close()
+            process.wait()
 
-            # 保存日志到文件
-            with open(log_path, "w") as log_file:
-                log_file.write(make_output)
+            # Makefile 未自行写编译日志时，以捕获的输出作为编译日志
+            if not os.path.exists(log_path):
+                os.replace(stream_path, log_path)
 
             # 检查错误关键字或返回码
-            if process.returncode != 0 or "Error" in make_output:
-                self.logger.error(f"Compilation failed for mode: {mode}. Log: {log_path}")
-                raise RuntimeError(f"Compilation failed for mode: {mode}")
+            if fatal_line is not None:
+                raise RuntimeError(f"Compilation aborted for mode: {target}: {fatal_line}")
+            if process.returncode != 0 or first_error is not None:
+                self.logger.error(f"Compilation failed for mode: {target}. Log: {log_path}")
+                if first_error is not None:
+                    self.logger.error(f"First error in compilation of mode {target}: {first_error}")
+                raise RuntimeError(f"Compilation failed for mode: {target}")
 
-            self.logger.info(f"Compilation successful for mode: {mode}. Log: {log_path}")
+            self.logger.info(f"Compilation successful for mode: {target}. Log: {log_path}")
+
+            if cache_key:
+                self.build_cache.store(cache_key, exec_dir)
+            self._mark_done(exec_dir)
 
         except Exception as e:
-            self.logger.error(f"Error during compilation for mode: {mode}: {e}")
-            raise
\ No newline at end of file
+            self.logger.error(f"Error during compilation for mode: {target}: {e}")
+            raise
+
+    def compile_modes(self, modes):
+        """
+        并行编译所有模式，并发上限由 --cmp_parallel 控制
+        用例同时需要覆盖率开/关两种镜像或自动波形镜像时，每个模式编译多个镜像，任一镜像失败即视为该模式编译失败
+        单个模式编译失败只会被记录，不会中断其他模式
+        :param modes: 模式列表
+        :return: (编译成功的模式列表, {失败模式: 错误信息})
+        """
+        self.logger.info(f"Compiling {len(modes)} modes ({len(self.gconf.builds)} builds each), "
+                         f"parallel limit: {self.gconf.cmp_parallel}")
+        failed_modes = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, self.gconf.cmp_parallel)) as executor:
+            futures = {executor.submit(self.compile_mode, mode, ccov, wave): mode
+                       for mode in modes for ccov, wave in self.gconf.builds}
+            for future in as_completed(futures):
+                mode = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    failed_modes.setdefault(mode, str(e))
+
+        passed_modes = [mode for mode in modes if mode not in failed_modes]
+        if failed_modes:
+            self.logger.error(f"Compilation failed for modes: {list(failed_modes)}, continuing with: {passed_modes}")
+        else:
+            self.logger.info(f"All {len(passed_modes)} modes compiled successfully.")
+        return passed_modes, failed_modes
\ No newline at end of file
@@ -3,6 +3,7 @@ import json
 import time
 from logger import Logger
 from regress_loader import RegressLoader
+from sharding import parse_shard
 
 
 class GConf:
@@ -22,6 +23,24 @@ class GConf:
         self.name = args.name or f"regression_{time.strftime('%Y%m%d%H%M%S')}"  # 如果未指定名称，则按当前日期命名
         self.mode = args.mode
         self.parallel = args.parallel or 20
+        self.cmp_parallel = args.cmp_parallel or 4
+        self.no_build_cache = args.no_build_cache
+        self.build_cache_max_gb = args.build_cache_max_gb
+        self.direct_exec = args.direct_exec
+        self.smoke_gate = args.smoke_gate
+        self.cancel_after = args.cancel_after
+        self.wave_parallel = args.wave_parallel
+        self.wave_nice = args.wave_nice
+        self.log_scan = args.log_scan
+        self.report_format = args.report_format
+        self.cmp_abort_on_fatal = args.cmp_abort_on_fatal
+        self.sim_abort_on_fatal = args.sim_abort_on_fatal
+        self.sim_max_errors = args.sim_max_errors or 0
+        self.backend = args.backend
+        self.fake_scheduler_socket = args.fake_scheduler_socket
+        self.admission_control = args.admission_control
+        self.max_load = args.max_load
+        self.mem_reserve_mb = args.mem_reserve_mb
         self.skip_cmp = args.skip_cmp
         self.skip_sim = args.skip_sim
         self.skip_cov_gen = args.skip_cov_gen
@@ -29,6 +48,18 @@ class GConf:
         self.ccov = args.ccov
         self.disable_cov = args.disable_cov
         self.random_seed = args.random_seed
+        self.resume = args.resume
+        self.rerun_failed = args.rerun_failed
+        self.rerun_wave = args.rerun_wave
+        self.rerun_opts = args.rerun_opts
+        self.shard = parse_shard(args.shard)
+        self.merge_shards = args.merge_shards
+        if self.merge_shards and not args.name:
+            raise ValueError("[ERROR] --merge_shards requires -n/--name of the merged regression!")
+        if self.rerun_failed and not args.name:
+            raise ValueError("[ERROR] --rerun_failed requires -n/--name of an existing regression!")
+        if self.resume and not args.name:
+            raise ValueError("[ERROR] --resume requires -n/--name of the regression to resume!")
 
         # 动态加载用户配置类（如 regress_cfg）
         self.logger.info("Loading regression configuration from regress_list.py...")
@@ -39,6 +70,30 @@ class GConf:
         self.err_keyword = getattr(config_class, "ERR_KEYWORD", "Failed|Error|FAILED|ERROR")
         self.logger.info(f"Loaded error keywords for log parsing: {self.err_keyword}")
 
+        # 日志中需排除的误报模式（例如 UVM 汇总行 "UVM_ERROR :    0"）
+        self.err_exclusion = getattr(config_class, "ERR_EXCLUSION", r"NO UVM_ERROR|UVM_ERROR\s+:\s+0")
+
+        # 编译致命错误模式（配合 --cmp_abort_on_fatal 使用），默认与 ERR_KEYWORD 相同
+        self.cmp_fatal_keyword = getattr(config_class, "CMP_FATAL_KEYWORD", self.err_keyword)
+
+        # 仿真致命错误模式（配合 --sim_abort_on_fatal 使用），不匹配 "UVM_FATAL :    0" 汇总行
+        self.sim_fatal_keyword = getattr(config_class, "SIM_FATAL_KEYWORD", r"UVM_FATAL\s+[^:\s]|\*F,")
+
+        # 冒烟门控（配合 --smoke_gate 使用）：TAGS 含以下标签的用例先行运行，失败率超过阈值时取消该模式其余运行
+        self.smoke_tags = getattr(config_class, "SMOKE_TAGS", ["smoke", "sanity"])
+        self.smoke_fail_rate = getattr(config_class, "SMOKE_FAIL_RATE", 0.5)
+
+        # license token 池：特性 -> token 数，以及各类运行需要的特性（sim 总是需要，ccov/wave 在对应开关打开时需要）
+        self.license_pool = getattr(config_class, "LICENSE_POOL", {})
+        self.license_require = getattr(config_class, "LICENSE_REQUIRE", {})
+        # license checkout 失败模式：匹配的失败运行不计为用例失败，最多重新排队 LICENSE_RETRIES 次
+        self.license_err_keyword = getattr(
+            config_class, "LICENSE_ERR_KEYWORD",
+            r"Licensed number of users already reached|[Uu]nable to checkout|[Ll]icense checkout fail|"
+            r"(?:FLEXnet|FlexNet|FLEXlm) Licensing error|lmgrd is not running"
+        )
+        self.license_retries = getattr(config_class, "LICENSE_RETRIES", 3)
+
         # 配置类加载的参数
         if args.mode:
             self.mode = args.mode  # 使用命令行模式列表
@@ -53,20 +108,40 @@ class GConf:
         # 调试日志
         self.logger.info(f"[DEBUG] Final mode list: {self.mode}")
 
+        # 波形配置：on / off / auto（先关闭波形运行，失败后以 wave=on 重跑）
+        self.wave = getattr(config_class, "WAVE", "off")
+
         # 加载测试用例并规范化键名为小写
         testcases = self._load_testcases(args.testcases, config_class)
         self.tc_list = self._normalize_case_keys(testcases)
 
+        # 主镜像的波形设置：仅 WAVE = "on" 时以 wave=on 编译；自动波形的失败重跑使用单独编译的波形镜像
+        self.cmp_wave = "on" if self.wave == "on" else "off"
+        self.wave_dump = getattr(config_class, "WAVE_DUMP", "{mode}/wave/{tc}_{seed}.fsdb")  # 波形文件路径模板
+
         # 从配置类中动态获取其他参数
         self.blk_name = getattr(config_class, "BLK_NAME", "default_block")  # 测试块名称
-        self.common_timeout_lmt = getattr(config_class, "COMMON_TIMEOUT_LMT", 15)  # 超时限制
-        self.wave = getattr(config_class, "WAVE", "off")  # 波形配置
+        self.common_timeout_lmt = getattr(config_class, "COMMON_TIMEOUT_LMT", 15)  # 单次仿真超时限制（分钟）
+        self.src_dirs = getattr(config_class, "SRC_DIRS", [])  # DUT/TB 源文件路径，用于编译缓存指纹
+        self.bsb_opts = getattr(config_class, "BSB_OPTS", "Local Machine")  # 批处理队列提交选项
         self.ccov = getattr(config_class, "CCOV", "on")  # 覆盖率配置
         
         # 配置覆盖率功能
         if self.disable_cov:
             self.logger.warning("Coverage functionality has been disabled by the user!")
             self.ccov = "off"
+            for case in self.tc_list:
+                case["ccov"] = "off"
+
+        # 需要编译的镜像 (ccov, wave)：主镜像使用 CCOV，用例的 ccov 与之不同时额外编译另一种覆盖率设置的镜像；
+        # 主镜像不带波形且存在自动波形用例时，为这些用例的 ccov 额外编译 wave=on 镜像，仅供失败重跑使用
+        self.builds = [(self.ccov, self.cmp_wave)]
+        self.builds += [(ccov, self.cmp_wave) for ccov in sorted({case["ccov"] for case in self.tc_list} - {self.ccov})]
+        if self.cmp_wave != "on":
+            self.builds += [(ccov, "on") for ccov in sorted({case["ccov"] for case in self.tc_list
+                                                             if case["wave"] == "auto"})]
+        if len(self.builds) > 1:
+            self.logger.info(f"Building {len(self.builds)} images per mode (ccov, wave): {self.builds}")
 
         # 设置回归任务主目录路径
         self.base_dir = "../"
@@ -75,6 +150,24 @@ class GConf:
         # 初始化目录结构
         self._prepare_directories()
 
+    def build_wave(self, ccov, wave=None):
+        """
+        运行实际使用的镜像的波形设置：请求 wave=on 且存在对应波形镜像时为 on，否则为主镜像的设置
+        """
+        return "on" if wave == "on" and (ccov, "on") in self.builds else self.cmp_wave
+
+    def build_name(self, ccov, wave=None):
+        """
+        覆盖率与波形设置对应的编译镜像名（make 变量 build），主镜像为空字符串
+        例如 cov、nocov、wave、cov_wave
+        """
+        parts = []
+        if ccov != self.ccov:
+            parts.append("cov" if ccov == "on" else "nocov")
+        if self.build_wave(ccov, wave) != self.cmp_wave:
+            parts.append("wave")
+        return "_".join(parts)
+
     def _normalize_case_keys(self, testcases):
         """
         将测试用例中的所有键名转换为小写，并补充默认值
@@ -82,7 +175,7 @@ class GConf:
         normalized_testcases = []
 
         default_fields = {
-            "wave": "off",  # 默认关闭波形
+            "wave": "auto" if self.wave == "auto" else "off",  # 默认关闭波形，全局 WAVE = "auto" 时为自动波形
             "ccov": "on"    # 默认开启覆盖率
         }
         for case in testcases:
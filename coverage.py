@@ -64,6 +64,32 @@ class CoverageManager:
 
         return True
 
+    def merge_coverage(self, mode, cov_dirs):
+        """
+        使用 make urg_merge 合并多个分片的覆盖率数据并生成覆盖率报告
+        :param mode: 当前模式名称
+        :param cov_dirs: 各分片该模式的覆盖率目录
+        """
+        task_name = "Coverage Merge"
+        if not cov_dirs:
+            self.logger.warning(f"No shard coverage data to merge for mode: {mode}")
+            return False
+        cmd = ["make", "urg_merge", f"mode={mode}", f"cov_dirs={' '.join(cov_dirs)}"]
+
+        try:
+            self._run_command(cmd, mode, task_name)
+
+            cov_dir = os.path.join(self.result_path, mode, "cov")
+            if not os.path.exists(cov_dir):
+                self.logger.error(f"Coverage directory not found: {cov_dir}")
+                raise FileNotFoundError(f"Coverage directory not found for mode: {mode}")
+
+        except Exception as e:
+            self.logger.error(f"Failed to merge coverage for mode: {mode}. Error: {str(e)}")
+            return False
+
+        return True
+
     def generate_testplan_annotation(self, mode):
         """
         使用 make vplan 生成测试计划注解
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+本地模拟批处理调度器，作为 LSF/SLURM 的替身用于验证 --backend fake 流程
+
+启动守护进程:   python fake_scheduler.py daemon --socket /tmp/regr_fake_scheduler.sock --slots 8
+提交数组作业:   python fake_scheduler.py submit --socket ... --array N script.sh
+终止数组成员:   python fake_scheduler.py kill --socket ... <job_id>[<index>]
+停止守护进程:   python fake_scheduler.py shutdown --socket ...
+
+数组成员以环境变量 FAKE_ARRAY_INDEX (1..N) 区分，每个成员在独立进程组中运行
+"""
+import os
+import re
+import sys
+import json
+import signal
+import asyncio
+import argparse
+
+
+class FakeScheduler:
+    """
+    模拟调度器守护进程，按 slots 限制同时运行的数组成员数
+    """
+
+    def __init__(self, slots):
+        self.slots = asyncio.Semaphore(slots)
+        self.next_job_id = 1000
+        self.processes = {}   # "job_id[index]" -> Process
+        self.cancelled = set()
+        self.server = None
+
+    async def _run_member(self, script, job_id, index):
+        key = f"{job_id}[{index}]"
+        async with self.slots:
+            if key in self.cancelled:
+                return
+            env = dict(os.environ, FAKE_ARRAY_INDEX=str(index))
+            process = await asyncio.create_subprocess_exec(
+                "/bin/bash", script, env=env, stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL, start_new_session=True
+            )
+            self.processes[key] = process
+            await process.wait()
+            self.processes.pop(key, None)
+
+    def submit(self, script, size):
+        self.next_job_id += 1
+        job_id = self.next_job_id
+        for index in range(1, size + 1):
+            asyncio.get_running_loop().create_task(self._run_member(script, job_id, index))
+        return f"Job <{job_id}> is submitted with {size} array members."
+
+    def kill(self, key):
+        self.cancelled.add(key)
+        process = self.processes.get(key)
+        if process is not None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        return f"Job <{key}> is being terminated."
+
+    async def handle(self, reader, writer):
+        try:
+            request = json.loads(await reader.readline())
+            op = request.get("op")
+            if op == "submit":
+                reply = self.submit(request["script"], int(request["array"]))
+            elif op == "kill":
+                reply = self.kill(request["job"])
+            elif op == "shutdown":
+                reply = "Scheduler shutting down."
+                self.server.close()
+            else:
+                reply = f"Unknown op: {op}"
+        except (ValueError, KeyError) as e:
+            reply = f"Bad request: {e}"
+        writer.write((reply + "\n").encode())
+        await writer.drain()
+        writer.close()
+
+    async def serve(self, socket_path):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        self.server = await asyncio.start_unix_server(self.handle, path=socket_path)
+        print(f"Fake scheduler listening on {socket_path}", flush=True)
+        try:
+            await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+
+async def send_request(socket_path, request):
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    writer.write((json.dumps(request) + "\n").encode())
+    await writer.drain()
+    reply = (await reader.readline()).decode().strip()
+    writer.close()
+    return reply
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake batch scheduler for regression backend testing")
+    parser.add_argument("command", choices=["daemon", "submit", "kill", "shutdown"])
+    parser.add_argument("target", nargs="?", help="submit: 数组作业脚本; kill: <job_id>[<index>]")
+    parser.add_argument("--socket", default="/tmp/regr_fake_scheduler.sock", help="守护进程 Unix socket 路径")
+    parser.add_argument("--slots", type=int, default=8, help="守护进程同时运行的数组成员上限 (默认: 8)")
+    parser.add_argument("--array", type=int, default=1, help="submit: 数组成员数")
+    args = parser.parse_intermixed_args()
+
+    if args.command == "daemon":
+        asyncio.run(FakeScheduler(args.slots).serve(args.socket))
+        return
+
+    if args.command == "submit":
+        request = {"op": "submit", "script": os.path.abspath(args.target), "array": args.array}
+    elif args.command == "kill":
+        if not args.target or not re.match(r"^\d+\[\d+\]$", args.target):
+            parser.error("kill requires <job_id>[<index>]")
+        request = {"op": "kill", "job": args.target}
+    else:
+        request = {"op": "shutdown"}
+
+    try:
+        print(asyncio.run(send_request(args.socket, request)))
+    except OSError as e:
+        print(f"[ERROR] Cannot reach fake scheduler at {args.socket}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import asyncio
+
+
+class LicensePool:
+    """
+    仿真器 license token 池：启动仿真前按所需特性一次性获取全部 token，结束后归还
+    LICENSE_POOL 未列出的特性不受限制
+    """
+
+    def __init__(self, gconf):
+        """
+        :param gconf: GConf 实例，使用 license_pool（特性 -> token 数）与 license_require（sim/ccov/wave -> 特性列表）
+        """
+        self.logger = gconf.logger
+        self.capacity = dict(gconf.license_pool)
+        self.available = dict(gconf.license_pool)
+        self.require = gconf.license_require
+        self._condition = None
+
+    def open(self):
+        """
+        在事件循环内调用，为本次运行队列重置 token 计数
+        """
+        self.available = dict(self.capacity)
+        self._condition = asyncio.Condition()
+
+    def features(self, case):
+        """
+        计算一次运行所需的 license 特性：仿真器本身、ccov=on 时的覆盖率特性、wave=on 时的波形特性，以及用例 LICENSES 字段
+        :return: 受池管理的特性列表
+        """
+        features = list(self.require.get("sim", []))
+        if case.get("ccov") == "on":
+            features += self.require.get("ccov", [])
+        if case.get("wave") == "on":
+            features += self.require.get("wave", [])
+        features += case.get("licenses", [])
+        return sorted({feature for feature in features if feature in self.capacity})
+
+    async def acquire(self, features):
+        """
+        等待直到所有特性同时有空闲 token 后一并获取，避免部分持有导致互相等待
+        """
+        if not features:
+            return
+        async with self._condition:
+            await self._condition.wait_for(lambda: all(self.available[feature] > 0 for feature in features))
+            for feature in features:
+                self.available[feature] -= 1
+
+    async def release(self, features):
+        """
+        归还 token 并唤醒等待者
+        """
+        if not features:
+            return
+        async with self._condition:
+            for feature in features:
+                self.available[feature] += 1
+            self._condition.notify_all()
@@ -0,0 +1,154 @@
+import os
+import re
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+
+# POSIX 字符类与 GNU 词边界到 Python 正则的转换
+_POSIX_CLASSES = {
+    "[:alpha:]": "a-zA-Z", "[:digit:]": "0-9", "[:alnum:]": "a-zA-Z0-9", "[:upper:]": "A-Z",
+    "[:lower:]": "a-z", "[:space:]": r"\s", "[:blank:]": r" \t", "[:punct:]": r"!-/:-@\[-`{-~",
+    "[:xdigit:]": "0-9A-Fa-f", "[:print:]": r" -~", "[:graph:]": r"!-~", "[:cntrl:]": r"\x00-\x1f\x7f",
+}
+
+
+def ere_to_python(pattern):
+    """
+    将 grep -E 使用的 POSIX 扩展正则转换为等价的 Python 正则（POSIX 字符类、\\< \\> 词边界）
+    """
+    for posix, python in _POSIX_CLASSES.items():
+        pattern = pattern.replace(posix, python)
+    return pattern.replace(r"\<", r"\b(?=\w)").replace(r"\>", r"\b(?<=\w)")
+
+
+class LogClassifier:
+    """
+    进程内日志分类器，语义与 grep -vE '<排除模式>' <log> | grep -E '<错误关键字>' 一致：
+    存在某一行不匹配排除模式且匹配错误关键字时，判定日志包含错误
+
+    tail_first 模式下先检查日志末尾的 UVM Report Summary：汇总中 UVM_ERROR/UVM_FATAL 计数非零即判定失败（快速失败路径）；
+    计数为零不能说明没有非 UVM 错误（仿真器 *E、断言 Error 文本等），仍做有界全文扫描（开头与末尾各 SCAN_LIMIT / 2），
+    因此不超过 SCAN_LIMIT 的日志与 grep 语义完全一致
+    日志以 mmap 映射，只有实际扫描的区域会被读入
+    判定失败的同一次扫描同时返回第一条错误行，用于生成失败签名
+    """
+
+    TAIL_BYTES = 256 * 1024  # 末尾汇总区域大小
+    SCAN_LIMIT = 512 * 1024 * 1024  # tail_first 模式下全文扫描的字节上限
+    POOL_THRESHOLD = 64  # 日志数少于该值时不启动进程池
+
+    SUMMARY_REGEX = re.compile(rb"UVM Report Summary")
+    SUMMARY_COUNT_REGEX = re.compile(rb"^\s*UVM_(?:ERROR|FATAL)\s*:\s*([0-9]+)", re.MULTILINE)
+
+    def __init__(self, err_keyword, exclusion, tail_first=False):
+        self.err_keyword = err_keyword
+        self.exclusion = exclusion
+        self.tail_first = tail_first
+        # 整块搜索用于快速定位候选行，逐行复核保证与 grep 的按行语义一致（\s 等可能跨行匹配）
+        self.err_regex = re.compile(ere_to_python(err_keyword).encode(), re.MULTILINE)
+        self.exclusion_regex = re.compile(ere_to_python(exclusion).encode(), re.MULTILINE)
+
+    @staticmethod
+    def _line_start(data, pos):
+        return data.rfind(b"\n", 0, pos) + 1 if pos > 0 else 0
+
+    def _scan_region(self, data, start, end):
+        """
+        检查 data[start:end] 覆盖的完整行
+        :return: 第一条错误行；没有时返回 None
+        """
+        start = self._line_start(data, start)
+        if end < len(data):
+            newline = data.find(b"\n", end)
+            end = len(data) if newline < 0 else newline
+        pos = start
+        while pos < end:
+            match = self.err_regex.search(data, pos, end)
+            if match is None:
+                return None
+            line_start = self._line_start(data, match.start())
+            line_end = data.find(b"\n", match.start(), end)
+            line_end = end if line_end < 0 else line_end
+            line = data[line_start:line_end]
+            if self.err_regex.search(line) and not self.exclusion_regex.search(line):
+                return line
+            pos = line_end + 1
+        return None
+
+    def _bounded_scan(self, data, size):
+        """
+        有界全文扫描：超过 SCAN_LIMIT 的日志只扫描开头与末尾各 SCAN_LIMIT / 2
+        """
+        if size <= self.SCAN_LIMIT:
+            return self._scan_region(data, 0, size)
+        half = self.SCAN_LIMIT // 2
+        return self._scan_region(data, 0, half) or self._scan_region(data, size - half, size)
+
+    def _tail_verdict(self, data, size):
+        """
+        快速失败路径：末尾的 UVM Report Summary 中 UVM_ERROR/UVM_FATAL 计数非零时直接判定失败
+        :return: 第一条错误行；没有汇总或计数为零（不能据此判定通过）时返回 None
+        """
+        tail_start = max(0, size - self.TAIL_BYTES)
+        summary = None
+        for summary in self.SUMMARY_REGEX.finditer(data, tail_start):
+            pass
+        if summary is None:
+            return None
+        for count in self.SUMMARY_COUNT_REGEX.finditer(data, summary.start()):
+            if int(count.group(1)):
+                # 失败已确定，向前查找第一条错误行作为签名来源；错误行都被排除时以汇总计数行代替
+                return self._bounded_scan(data, size) or count.group(0)
+        return None
+
+    def first_error(self, log_path):
+        """
+        :return: 第一条错误行（已去除首尾空白）；日志不包含错误或无法读取时返回 None（与 grep 读取失败时一致）
+        """
+        try:
+            with open(log_path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    if self.tail_first:
+                        line = self._tail_verdict(data, size) or self._bounded_scan(data, size)
+                    else:
+                        line = self._scan_region(data, 0, size)
+        except (OSError, ValueError):
+            return None
+        return None if line is None else line.decode("utf-8", errors="replace").strip()
+
+    def has_error(self, log_path):
+        """
+        :return: 日志是否包含错误
+        """
+        return self.first_error(log_path) is not None
+
+    def classify(self, log_paths, workers=None):
+        """
+        批量分类，日志较多时使用跨所有模式共享的进程池
+        :param log_paths: 日志路径列表
+        :param workers: 进程数，默认 CPU 核数
+        :return: {日志路径: 第一条错误行，不包含错误时为 None}
+        """
+        log_paths = list(log_paths)
+        if len(log_paths) < self.POOL_THRESHOLD:
+            return {path: self.first_error(path) for path in log_paths}
+
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(log_paths) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.err_keyword, self.exclusion, self.tail_first)) as executor:
+            return dict(zip(log_paths, executor.map(_first_error, log_paths, chunksize=chunksize)))
+
+
+_worker_classifier = None
+
+
+def _init_worker(err_keyword, exclusion, tail_first):
+    global _worker_classifier
+    _worker_classifier = LogClassifier(err_keyword, exclusion, tail_first)
+
+
+def _first_error(log_path):
+    return _worker_classifier.first_error(log_path)
\ No newline at end of file
@@ -0,0 +1,103 @@
+import os
+from collections import Counter
+
+
+class LogWatcher:
+    """
+    仿真运行中的日志监视器，增量读取日志并匹配错误关键字与致命错误模式
+    由调用方周期性调用 scan()，满足终止条件时 triggered 置为 True
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, paths, err_regex, exclusion_regex, fatal_regex=None, max_errors=0):
+        """
+        :param paths: 候选日志路径列表，按优先级监视第一个已存在的文件
+        :param err_regex: 错误关键字正则 (ERR_KEYWORD)
+        :param exclusion_regex: 排除模式正则（例如 "UVM_ERROR : 0" 汇总行）
+        :param fatal_regex: 致命错误正则，匹配到即触发；None 表示不启用
+        :param max_errors: 错误行数达到该值即触发；0 表示不启用
+        """
+        self.paths = paths
+        self.err_regex = err_regex
+        self.exclusion_regex = exclusion_regex
+        self.fatal_regex = fatal_regex
+        self.max_errors = max_errors
+
+        self.error_count = 0
+        self.signature = None  # 第一条错误/致命行
+        self.reason = None     # 触发终止的原因
+        self.triggered = False
+
+        self._path = None
+        self._offset = 0
+        self._partial = b""
+        self._counted = Counter()  # 当前文件中已计数的错误行
+        self._replay = Counter()   # 切换前的文件中已计数、新文件中可能重复出现的错误行
+
+    def _current_path(self):
+        for path in self.paths:
+            if os.path.exists(path):
+                return path
+        return None
+
+    def scan(self, max_bytes=None):
+        """
+        读取自上次调用以来新增的日志内容
+        :param max_bytes: 单次调用最多读取的字节数，None 表示读到文件末尾；剩余内容留待下次调用
+        :return: 是否触发终止条件
+        """
+        if self.triggered:
+            return True
+
+        path = self._current_path()
+        if path is None:
+            return False
+        if path != self._path:
+            # 监视目标切换（例如 Makefile 日志晚于标准输出文件出现）时从头读取，计数与签名保留；
+            # 两个文件内容不完全相同，新文件中与已计数内容相同的错误行按行去重，不重复计数
+            self._path, self._offset, self._partial = path, 0, b""
+            self._replay, self._counted = self._replay + self._counted, Counter()
+
+        with open(path, "rb") as f:
+            f.seek(self._offset)
+            bytes_read = 0
+            while not self.triggered and (max_bytes is None or bytes_read < max_bytes):
+                chunk = f.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                bytes_read += len(chunk)
+                self._offset += len(chunk)
+                lines = (self._partial + chunk).split(b"\n")
+                self._partial = lines.pop()
+                for line in lines:
+                    if self._match_line(line.decode("utf-8", errors="replace")):
+                        break
+        return self.triggered
+
+    def _match_line(self, line):
+        """
+        匹配单行内容，满足终止条件时返回 True
+        """
+        if self.exclusion_regex.search(line):
+            return False
+
+        if self.fatal_regex is not None and self.fatal_regex.search(line):
+            self.signature = self.signature or line.strip()
+            self.reason = f"fatal pattern: {line.strip()}"
+            self.triggered = True
+            return True
+
+        if self.err_regex.search(line):
+            key = line.strip()
+            if self._replay[key]:
+                self._replay[key] -= 1
+                return False
+            self._counted[key] += 1
+            self.error_count += 1
+            self.signature = self.signature or line.strip()
+            if self.max_errors and self.error_count >= self.max_errors:
+                self.reason = f"{self.error_count} error(s), first: {self.signature}"
+                self.triggered = True
+                return True
+        return False
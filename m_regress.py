@@ -5,6 +5,7 @@ from compiler import Compiler
 from simulation import SimulationManager
 from coverage import CoverageManager
 from report import ReportGenerator
+from sharding import ShardMerger
 
 def main():
     import argparse
@@ -16,12 +17,51 @@ def main():
     parser.add_argument("-n", "--name", help="指定回归任务名称", default=None)
     parser.add_argument("-m", "--mode", action="append", help="模式列表，例如: base_fun, axi3, axi4")
     parser.add_argument("--parallel", type=int, default=20, help="设置并行任务上限 (默认: 20)")
+    parser.add_argument("--cmp_parallel", type=int, default=4, help="设置并行编译模式数上限 (默认: 4)")
+    parser.add_argument("--backend", choices=["local", "lsf", "slurm", "fake"], default="local",
+                        help="仿真执行后端 (默认: local)；批处理后端使用 BSB_OPTS 作为提交选项")
+    parser.add_argument("--fake_scheduler_socket", default="/tmp/regr_fake_scheduler.sock",
+                        help="fake 后端使用的 fake_scheduler.py 守护进程 socket 路径")
+    parser.add_argument("--admission_control", action="store_true",
+                        help="根据主机负载、可用内存和历史峰值 RSS 控制仿真启动")
+    parser.add_argument("--max_load", type=float, default=1.0,
+                        help="准入控制的每 CPU 负载上限 (默认: 1.0)")
+    parser.add_argument("--mem_reserve_mb", type=int, default=2048,
+                        help="准入控制为主机保留的内存 MB (默认: 2048)")
 
     # 阶段控制参数
+    parser.add_argument("--rerun_failed", action="store_true",
+                        help="仅按原种子重新运行 final_report.json 中的失败用例，并重新生成报告")
+    parser.add_argument("--rerun_wave", action="store_true", help="rerun 时打开波形 (wave=on)")
+    parser.add_argument("--rerun_opts", default="", help="rerun 时追加的 make 变量，例如 \"pl=UVM_HIGH\"")
     parser.add_argument("--skip_cmp", action="store_true", help="跳过编译阶段")
+    parser.add_argument("--smoke_gate", action="store_true",
+                        help="各模式先运行 TAGS 含 SMOKE_TAGS 的用例，失败率超过 SMOKE_FAIL_RATE 时取消该模式其余运行")
+    parser.add_argument("--resume", action="store_true",
+                        help="根据 ../<name>/run_journal.jsonl 续跑被中断的回归，跳过已完成的编译与已结束的运行")
     parser.add_argument("--skip_sim", action="store_true", help="跳过仿真阶段")
     parser.add_argument("--skip_cov_gen", action="store_true", help="跳过覆盖率生成阶段")
     parser.add_argument("--skip_cov_rpt", action="store_true", help="跳过覆盖率报告生成阶段")
+    parser.add_argument("--no_build_cache", action="store_true", help="禁用编译缓存，总是重新编译")
+    parser.add_argument("--build_cache_max_gb", type=float, default=50,
+                        help="编译缓存总大小上限 (GB)，超出时按最近使用时间淘汰旧缓存项 (默认: 50，0 表示不限制)")
+    parser.add_argument("--direct_exec", action="store_true",
+                        help="直接执行解析后的 ncrun 配方，省去每次仿真的 make 启动开销；"
+                             "配方使用目标/模式专属变量、.SHELLFLAGS 或 .ONESHELL 时自动回退为 make ncrun")
+    parser.add_argument("--cmp_abort_on_fatal", action="store_true",
+                        help="编译输出中出现致命错误模式 (CMP_FATAL_KEYWORD) 时立即终止编译")
+    parser.add_argument("--sim_abort_on_fatal", action="store_true",
+                        help="仿真日志中出现致命错误模式 (SIM_FATAL_KEYWORD) 时立即终止该次仿真")
+    parser.add_argument("--cancel_after", type=int, default=0,
+                        help="同一用例出现 K 次相同归一化错误签名的失败后取消其余种子 (默认: 0，不启用)；用例可用 CANCEL_AFTER 覆盖")
+    parser.add_argument("--sim_max_errors", type=int, default=0,
+                        help="仿真日志中错误行数达到该值时终止该次仿真 (默认: 0，不启用)")
+
+    # 波形相关参数
+    parser.add_argument("--wave_parallel", type=int, default=2,
+                        help="WAVE = \"auto\" 时失败运行 wave=on 重跑的并发上限 (默认: 2)")
+    parser.add_argument("--wave_nice", type=int, default=10,
+                        help="WAVE = \"auto\" 时波形重跑的 nice 优先级 (默认: 10)")
 
     # 覆盖率相关参数
     parser.add_argument("--ccov", choices=["on", "off"], default="on", help="覆盖率开关 (默认: on)")
@@ -30,6 +70,18 @@ def main():
     # 测试用例参数
     parser.add_argument("--testcases", type=str, help="从测试用例文件加载测试用例列表 (JSON 格式)")
     parser.add_argument("--random_seed", type=int, default=1234, help="设置随机种子 (默认: 1234)")
+    parser.add_argument("--shard", default=None,
+                        help="只运行第 k/N 个分片，例如 2/4；各主机需使用相同的 --random_seed 与用例列表")
+    parser.add_argument("--merge_shards", nargs="+", default=None, metavar="DIR",
+                        help="将多个分片回归目录合并到 -n 指定的回归目录并生成统一报告")
+
+    # 报告相关参数
+    parser.add_argument("--log_scan", choices=["tail", "full"], default="tail",
+                        help="日志判定方式：tail 在末尾 UVM Report Summary 计数非零时快速判定失败，否则做有界全文扫描"
+                             "（超过 512 MiB 的日志只扫描开头与末尾）；full 不设上限的全文扫描 (默认: tail)")
+    parser.add_argument("--report_format", choices=["jsonl", "json"], default="jsonl",
+                        help="最终报告格式：jsonl 逐条写入每次运行到 report_runs.jsonl，final_report.json 仅保留汇总；"
+                             "json 为原有的单个 final_report.json (默认: jsonl)")
 
     # 通用参数
     parser.add_argument("--log_level", choices=["INFO", "DEBUG", "WARNING", "ERROR"], default="DEBUG",
@@ -56,20 +108,36 @@ def main():
     modes = gconf.mode or ["default_mode"]  # 默认模式可以是 ["default_mode"] 或从 gconf.mode 读取
     dm.create_mode_directories(modes)
 
+    # 合并分片回归：不编译、不仿真，仅合并日志与覆盖率后生成报告
+    if gconf.merge_shards:
+        ShardMerger(gconf, coverage, reporter).merge(gconf.merge_shards)
+        return
+
+    # 仅重跑失败用例：结果写回同一回归目录后重新生成报告
+    if gconf.rerun_failed:
+        simulator.rerun_failed(reporter.load_failures())
+        reporter.generate_final_report()
+        return
+
+    # 编译失败的模式不进入仿真阶段
+    sim_modes, failed_modes = gconf.mode, {}
     if not gconf.skip_cmp:
-        for mode in gconf.mode:
-            compiler.compile_mode(mode)
+        sim_modes, failed_modes = compiler.compile_modes(gconf.mode)
 
     if not gconf.skip_sim:
-        simulator.run_simulations()
+        simulator.run_simulations(sim_modes)
 
     if not gconf.skip_cov_gen:
         for mode in gconf.mode:
+            # 编译失败的模式没有覆盖率数据库
+            if mode in failed_modes:
+                gconf.logger.warning(f"Skipping coverage report for mode that failed to compile: {mode}")
+                continue
             # 为每个模式生成覆盖率报告
             if not coverage.generate_coverage_report(mode):
                 gconf.logger.error(f"Failed to generate coverage report for mode: {mode}")
 
-    reporter.generate_final_report()
+    reporter.generate_final_report(failed_modes)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,181 @@
+import re
+import asyncio
+
+
+class RecipeCache:
+    """
+    ncrun 配方缓存：每个模式（及额外 make 变量组合）只用 make -n 解析一次 ncrun 配方，
+    之后每次运行只替换 tc/seed 并直接由 shell 执行，省去每个种子重新解析 Makefile、逐行启动 shell 的开销
+
+    解析结果不可靠时（配方依赖 tc/seed 的派生值、递归 make、make -n 失败等）该组合回退为 make ncrun；
+    ncrun 使用目标/模式专属变量（其 export 只在 make 执行该目标时生效）、非默认 .SHELLFLAGS、.ONESHELL
+    或 - 前缀（忽略错误）的配方行时同样回退
+    注意：直接执行时不再回显未加 @ 的命令行
+    """
+
+    TARGET = "ncrun"
+    # 两组占位值：分别解析后相互替换应得到相同结果，否则说明配方依赖 tc/seed 的派生值
+    # 占位值不会出现在正常的配方与环境中，按文本替换为实际 tc/seed 时不会误改其他内容
+    PLACEHOLDERS = (("__regr_tc_a__", "__regr_seed_a__"), ("__regr_tc_b__", "__regr_seed_b__"))
+    ENV_TARGET = "__regr_recipe_env"
+    DEFAULT_SHELLFLAGS = "-c"
+
+    def __init__(self, gconf):
+        self.logger = gconf.logger
+        self.result_path = gconf.result_path
+        self._recipes = {}  # make 变量组合 -> asyncio.Future，结果为 (shell, script, env) 或 None
+
+    @staticmethod
+    def _split_vars(cmd):
+        """
+        将 make ncrun 命令拆分为 tc、seed 与其余 make 变量
+        :return: (tc, seed, other_vars)
+        """
+        tc = seed = None
+        other_vars = []
+        for arg in cmd[2:]:
+            if arg.startswith("tc="):
+                tc = arg[len("tc="):]
+            elif arg.startswith("seed="):
+                seed = arg[len("seed="):]
+            else:
+                other_vars.append(arg)
+        return tc, seed, tuple(other_vars)
+
+    async def _make(self, *args):
+        """
+        在回归目录中运行 make
+        :return: (返回码, 标准输出文本)
+        """
+        process = await asyncio.create_subprocess_exec(
+            "make", "--no-print-directory", *args, cwd=self.result_path,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await process.communicate()
+        return process.returncode, stdout.decode(errors="replace")
+
+    def _unsupported_features(self, database):
+        """
+        检查 make -p 输出的数据库中直接执行无法复现的特性
+        :return: 原因描述；没有时返回 None
+        """
+        target_vars = re.compile(rf"^{re.escape(self.TARGET)}: [^\s=#]+ (?:::|:|\+|\?|!)?= ", re.MULTILINE)
+        if target_vars.search(database):
+            return "target-specific variables"
+        if re.search(r"^# [0-9]+ pattern-specific variable values", database, re.MULTILINE):
+            return "pattern-specific variables"
+        if re.search(r"^\.ONESHELL:", database, re.MULTILINE):
+            return ".ONESHELL"
+        if self._ignores_errors(database):
+            return "'-' (ignore errors) recipe lines"
+        shellflags = re.search(r"^\.SHELLFLAGS :?= ?(.*)$", database, re.MULTILINE)
+        if shellflags and shellflags.group(1).strip() != self.DEFAULT_SHELLFLAGS:
+            return f".SHELLFLAGS = {shellflags.group(1).strip()}"
+        return None
+
+    def _ignores_errors(self, database):
+        """
+        检查数据库中 ncrun 的配方是否有 - 前缀（忽略错误）的命令行；直接执行时任一行失败即退出，无法保持该语义
+        """
+        recipe = re.search(rf"^{re.escape(self.TARGET)}:[^=\n]*\n(?:#[^\n]*\n)*?#  recipe to execute[^\n]*\n"
+                           rf"((?:\t[^\n]*\n?)*)", database, re.MULTILINE)
+        if recipe is None:
+            return False
+        continued = False
+        for line in recipe.group(1).splitlines():
+            if not continued and re.match(r"^\t[@+]*-", line):
+                return True
+            continued = line.endswith("\\")
+        return False
+
+    @staticmethod
+    def _build_script(dry_run_output):
+        """
+        将 make -n 的输出组装为单个 shell 脚本：每条配方行在子 shell 中执行（与 make 逐行启动 shell 的语义一致），
+        任一行失败即以其返回码退出
+        """
+        commands, current = [], []
+        for line in dry_run_output.splitlines():
+            current.append(line)
+            if not line.endswith("\\"):
+                commands.append("\n".join(current))
+                current = []
+        if current:
+            commands.append("\n".join(current))
+        return "\n".join(f"( {command}\n) || exit $?" for command in commands if command.strip())
+
+    async def _resolve(self, other_vars):
+        """
+        解析一个 make 变量组合对应的 ncrun 配方
+        :return: (shell, script, env)，无法可靠解析时返回 None
+        """
+        try:
+            return await self._resolve_recipe(other_vars)
+        except OSError as e:
+            self.logger.warning(f"Failed to resolve {self.TARGET} recipe: {e}, falling back to make.")
+            return None
+
+    async def _resolve_recipe(self, other_vars):
+        outputs = []
+        for tc, seed in self.PLACEHOLDERS:
+            returncode, output = await self._make("-n", self.TARGET, *other_vars, f"tc={tc}", f"seed={seed}")
+            if returncode != 0:
+                self.logger.warning(f"make -n {self.TARGET} failed for {' '.join(other_vars)}, falling back to make.")
+                return None
+            outputs.append(output)
+
+        (tc_a, seed_a), (tc_b, seed_b) = self.PLACEHOLDERS
+        if outputs[0].replace(tc_a, tc_b).replace(seed_a, seed_b) != outputs[1]:
+            self.logger.warning(f"{self.TARGET} recipe depends on values derived from tc/seed "
+                                f"for {' '.join(other_vars)}, falling back to make.")
+            return None
+        if "make" in outputs[0].split() or "$(MAKE)" in outputs[0]:
+            self.logger.warning(f"{self.TARGET} recipe invokes make recursively, falling back to make.")
+            return None
+
+        # make -q 只输出数据库而不执行配方，目标未更新导致的非零返回码可忽略
+        tc, seed = self.PLACEHOLDERS[0]
+        _, database = await self._make("-p", "-q", self.TARGET, *other_vars, f"tc={tc}", f"seed={seed}")
+        reason = self._unsupported_features(database)
+        if reason:
+            self.logger.warning(f"{self.TARGET} recipe uses {reason}, which direct execution cannot reproduce, "
+                                f"falling back to make.")
+            return None
+
+        # 配方执行时的 shell 与环境（包含 make 导出的 MAKEFLAGS、MAKELEVEL 及 export 变量）
+        returncode, output = await self._make(
+            f"--eval={self.ENV_TARGET}: ; @printf '%s\\0' '$(SHELL)'; env -0",
+            self.ENV_TARGET, *other_vars, f"tc={tc_a}", f"seed={seed_a}"
+        )
+        if returncode != 0:
+            self.logger.warning(f"Failed to capture {self.TARGET} recipe environment, falling back to make.")
+            return None
+        shell, *entries = [entry for entry in output.split("\0") if entry]
+        env = dict(entry.split("=", 1) for entry in entries if "=" in entry)
+
+        self.logger.info(f"Resolved {self.TARGET} recipe for {' '.join(other_vars)}, executing directly.")
+        return shell, self._build_script(outputs[0]), env
+
+    async def command(self, cmd):
+        """
+        将 make ncrun 命令转换为直接执行的命令
+        :param cmd: make ncrun 命令列表
+        :return: (命令列表, 环境变量)；无法直接执行时返回 (cmd, None)
+        """
+        tc, seed, other_vars = self._split_vars(cmd)
+        if cmd[:2] != ["make", self.TARGET] or tc is None or seed is None:
+            return cmd, None
+
+        # 同一组合的并发运行共享一次解析
+        future = self._recipes.get(other_vars)
+        if future is None:
+            future = self._recipes[other_vars] = asyncio.ensure_future(self._resolve(other_vars))
+        recipe = future.result() if future.done() else await asyncio.shield(future)
+        if recipe is None:
+            return cmd, None
+
+        shell, script, env = recipe
+        (tc_ph, seed_ph), _ = self.PLACEHOLDERS
+        script = script.replace(tc_ph, tc).replace(seed_ph, seed)
+        env = {key: value.replace(tc_ph, tc).replace(seed_ph, seed) for key, value in env.items()}
+        return [shell, "-c", script], env
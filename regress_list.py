@@ -2,13 +2,20 @@ class regress_cfg:
     TC_LIST = [
         # {"TC": "Test_Case_1", "SEED": 123456, "SIM_OPTS": "pl=UVM_HIGH", "RUN_TIMES": 3, "TIMEOUT_LMT": 300, "MODE": ["mode1"]},
         # {"TC": "Test_Case_2", "SEED": 987654, "SIM_OPTS": "pl=UVM_LOW", "RUN_TIMES": 2, "MODE": ["mode2"]},
-        {"TC": "tc_sanity",  "SIM_OPTS": "", "RUN_TIMES": 10, "MODE": "base_fun"},
+        {"TC": "tc_sanity",  "SIM_OPTS": "", "RUN_TIMES": 10, "MODE": "base_fun", "TAGS": ["sanity"]},
     ]
 
     ERR_KEYWORD = "Failed|Error|FAILED|ERROR"
     BLK_NAME = "cm_ahb_mon"
     CCOV = "on"
     COMMON_TIMEOUT_LMT = 15
-    WAVE = "off"
+    WAVE = "off"  # on / off / auto（失败运行自动以 wave=on 重跑），用例可用 WAVE 字段单独设置
+    WAVE_DUMP = "{mode}/wave/{tc}_{seed}.fsdb"  # 波形文件路径模板（相对回归目录），报告中链接失败运行的波形
     BSB_OPTS = "Local Machine"
-    REGRESS_UDC = ""
\ No newline at end of file
+    REGRESS_UDC = ""
+    SMOKE_TAGS = ["smoke", "sanity"]  # --smoke_gate 时先行运行的用例标签
+    SMOKE_FAIL_RATE = 0.5  # 冒烟运行失败率超过该值时取消该模式的其余运行
+    LICENSE_POOL = {}  # license 特性 -> 可用 token 数，例如 {"VCSRuntime_Net": 20, "VCSCoverage": 8}，为空时不限制
+    LICENSE_REQUIRE = {"sim": ["VCSRuntime_Net"], "ccov": ["VCSCoverage"], "wave": ["Verdi"]}  # 各类运行需要的特性
+    LICENSE_RETRIES = 3  # license checkout 失败的运行最多重新排队次数
+    SRC_DIRS = []  # DUT/TB 源文件或目录，例如 ["../rtl", "../tb"]，用于编译缓存
\ No newline at end of file
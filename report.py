@@ -1,8 +1,13 @@
 import os
 import json
-import subprocess
 import re
+import itertools
 from coverage_parser import CoverageParser
+from log_classifier import LogClassifier
+from report_reader import ReportReader
+from results_index import ResultsIndex
+from signature import normalize_signature
+from run_journal import RunJournal
 
 
 class ReportGenerator:
@@ -10,47 +15,283 @@ class ReportGenerator:
     汇总仿真结果、解析覆盖率并生成最终报告
     """
 
+    CMP_LOG_REGEX = re.compile(r"^cmp(?:_(?:no)?cov)?(?:_wave)?(?:\.stream)?\.log$")
+
     def __init__(self, gconf):
         self.gconf = gconf
         self.logger = gconf.logger
         self.result_path = gconf.result_path
 
         # 定义排除模式和错误关键词的正则
-        self.exclusion_patterns = r"NO UVM_ERROR|UVM_ERROR\s+:\s+0"  # 忽略的模式
+        self.exclusion_patterns = gconf.err_exclusion  # 忽略的模式（ERR_EXCLUSION）
         self.error_patterns = gconf.err_keyword  # 重点匹配的错误关键词列表（例如: UVM_ERROR|ASSERTION|FAIL|ERROR）
+        self.classifier = LogClassifier(self.error_patterns, self.exclusion_patterns,
+                                        tail_first=gconf.log_scan == "tail")
+        self.results = ResultsIndex(self.result_path, self.logger)
 
     def log_contains_error(self, log_path):
         """
-        使用 grep 检查日志文件是否包含错误关键词
+        检查日志文件是否包含错误关键词（进程内匹配，语义同 grep -vE '<排除模式>' | grep -E '<错误关键词>'）
+        """
+        return self.classifier.has_error(log_path)
+
+    def _run_logs(self, mode):
+        """
+        列出模式日志目录中的仿真运行日志（不含各镜像的 cmp*.log 与 cmp*.stream.log）
+        """
+        log_dir = os.path.join(self.result_path, mode, "log")
+        if not os.path.exists(log_dir):
+            return []
+        return [log for log in os.listdir(log_dir)
+                if log.endswith(".log") and not self.CMP_LOG_REGEX.match(log)]
+
+    def load_failures(self):
+        """
+        读取上一次 generate_final_report 写入的失败运行列表（两种报告格式均可）
+        :return: [{"mode", "test_case", "seed", "log_path"}, ...]
+        """
+        failures = ReportReader(self.result_path).failures()
+        self.logger.info(f"Loaded {len(failures)} failed runs from: {self.result_path}")
+        return failures
+
+    def _wave_links(self, mode, test_case, seed):
+        """
+        查找失败运行的波形文件（WAVE_DUMP 模板）及自动波形重跑日志
+        :return: {"wave": 路径, "wave_log": 路径}，不存在的项省略
+        """
+        links = {}
+        wave_path = os.path.join(self.result_path, self.gconf.wave_dump.format(mode=mode, tc=test_case, seed=seed))
+        if os.path.exists(wave_path):
+            links["wave"] = wave_path
+        wave_log = os.path.join(self.result_path, mode, "log", f"{test_case}_{seed}.wave.log")
+        if os.path.exists(wave_log):
+            links["wave_log"] = wave_log
+        return links
+
+    def _skipped_runs(self):
+        """
+        从运行日志统计被取消（冒烟门控、重复失败签名）的运行数
+        :return: {(mode, tc): 跳过次数}
+        """
+        journal = RunJournal(os.path.join(self.result_path, "run_journal.jsonl"), self.logger)
+        _, finished = journal.replay()
+        skipped = {}
+        for (mode, tc, _), status in finished.items():
+            if status == "SKIPPED":
+                skipped[(mode, tc)] = skipped.get((mode, tc), 0) + 1
+        return skipped
+
+    def _collect_from_logs(self, mode, log_errors, skipped_runs, stats_summary, regression_results):
+        """
+        扫描模式日志目录统计测试用例结果（没有结果索引时使用）
+        :param log_errors: {日志路径: 第一条错误行，不包含错误时为 None}
+        :param skipped_runs: {(mode, tc): 跳过次数}
+        :param stats_summary: 本模式的统计结果，逐条更新
+        :param regression_results: 失败运行列表，追加本模式的失败运行
+        :return: 逐条产生 (运行条目, 失败信息或 None)
+        """
+        log_dir = os.path.join(self.result_path, mode, "log")
+
+        # 被取消的运行没有参与统计的日志，单独计数
+        for (skipped_mode, test_case), count in skipped_runs.items():
+            if skipped_mode == mode:
+                stats_summary.setdefault(test_case, {"total_runs": 0, "pass_count": 0, "fail_count": 0})
+                stats_summary[test_case]["skip_count"] = count
+
+        for log in self._run_logs(mode):
+            # 假设日志文件名格式为 "<用例名>_<seed>.log"
+            match = re.match(r"^(.*)_([0-9]+)\.log$", log)
+            if match:
+                test_case = match.group(1)  # 提取用例名
+                seed = match.group(2)  # 提取种子
+                log_path = os.path.join(log_dir, log)
+
+                # 初始化统计结果
+                stats = stats_summary.setdefault(test_case, {"total_runs": 0, "pass_count": 0, "fail_count": 0})
+
+                # 更新总运行次数
+                stats["total_runs"] += 1
+
+                # 是否包含错误
+                fail_info = None
+                if log_errors[log_path]:
+                    stats["fail_count"] += 1
+                    # Add fail information to regression_results
+                    fail_info = {
+                        "mode": mode,
+                        "test_case": test_case,
+                        "log_path": log_path,
+                        "seed": seed,
+                        "signature": normalize_signature(log_errors[log_path]),
+                    }
+                    fail_info.update(self._wave_links(mode, test_case, seed))
+                    regression_results.append(fail_info)
+                else:
+                    stats["pass_count"] += 1
+
+                # 日志文件解析结果
+                yield {"test_case": test_case, "seed": seed, "file": log}, fail_info
+
+    def _collect_from_index(self, records, stats_by_mode, regression_results):
+        """
+        根据结果索引统计测试用例结果，不读取日志
+        :param records: 索引记录迭代器（所有模式）
+        :param stats_by_mode: {mode: 统计结果}，逐条更新
+        :param regression_results: 失败运行列表，追加失败运行
+        :return: 逐条产生 (mode, 运行条目, 失败信息或 None)；跳过的运行也会产生，条目 status 为 SKIPPED
+        """
+        for record in records:
+            mode, test_case, seed, status = record["mode"], record["tc"], str(record["seed"]), record["status"]
+            stats = stats_by_mode.setdefault(mode, {}).setdefault(
+                test_case, {"total_runs": 0, "pass_count": 0, "fail_count": 0})
+            if status == "SKIPPED":
+                stats["skip_count"] = stats.get("skip_count", 0) + 1
+                yield mode, {"test_case": test_case, "seed": seed, "status": status}, None
+                continue
+
+            # 重试后仍未取得 license 的运行没有真正执行，单独计数，不计入失败数与通过率；仍列入失败列表以便 --rerun_failed
+            if status == "LICENSE":
+                stats["license_count"] = stats.get("license_count", 0) + 1
+            else:
+                stats["total_runs"] += 1
+            log_path = os.path.join(self.result_path, record["log"])
+            fail_info = None
+            if status == "PASS":
+                stats["pass_count"] += 1
+            else:
+                if status != "LICENSE":
+                    stats["fail_count"] += 1
+                fail_info = {
+                    "mode": mode,
+                    "test_case": test_case,
+                    "log_path": log_path,
+                    "seed": seed,
+                    "status": status,
+                    "signature": record["signature"],
+                }
+                fail_info.update(self._wave_links(mode, test_case, seed))
+                regression_results.append(fail_info)
+            yield mode, {"test_case": test_case, "seed": seed, "file": os.path.basename(record["log"]),
+                         "status": status, "duration": record["duration"]}, fail_info
+
+    def _collect_runs(self, regression_results):
+        """
+        收集所有模式的运行结果：优先使用仿真引擎写入的结果索引，没有索引时（例如旧回归目录）回退为扫描日志
+        :param regression_results: 失败运行列表，追加失败运行
+        :return: ({mode: 统计结果}, 逐条产生 (mode, 运行条目, 失败信息或 None) 的迭代器)；统计结果在迭代过程中填充
+        """
+        stats_by_mode = {}
+        if self.results.exists():
+            return stats_by_mode, self._collect_from_index(self.results.iter_records(), stats_by_mode,
+                                                           regression_results)
+
+        self.logger.warning(f"Results index not found, classifying logs: {self.results.path}")
+        skipped_runs = self._skipped_runs()
+
+        # 所有模式的运行日志统一交给分类器，日志较多时由跨模式共享的进程池并行分类
+        log_errors = self.classifier.classify(
+            os.path.join(self.result_path, mode, "log", log)
+            for mode in self.gconf.mode for log in self._run_logs(mode)
+        )
+        runs = itertools.chain.from_iterable(
+            ((mode, run, fail_info) for run, fail_info in self._collect_from_logs(
+                mode, log_errors, skipped_runs, stats_by_mode.setdefault(mode, {}), regression_results))
+            for mode in self.gconf.mode
+        )
+        return stats_by_mode, runs
+
+    def _write_runs(self, runs):
+        """
+        消费运行结果迭代器
+        jsonl 格式：每次运行逐行写入 report_runs.jsonl（失败运行合并失败信息），不在内存中保留运行条目
+        json 格式：按模式收集运行条目，写入 final_report.json（不含跳过的运行，与原有格式一致）
+        :return: {mode: 运行条目列表}，jsonl 格式下为空
+        """
+        test_case_logs = {}
+        if self.gconf.report_format != "jsonl":
+            for mode, run, _ in runs:
+                if run.get("status") != "SKIPPED":
+                    test_case_logs.setdefault(mode, []).append(run)
+            return test_case_logs
+
+        runs_file = os.path.join(self.result_path, ReportReader.RUNS_FILE)
+        count = 0
+        with open(runs_file, "w") as f:
+            for mode, run, fail_info in runs:
+                entry = {"mode": mode, **run}
+                entry.setdefault("status", "FAIL" if fail_info else "PASS")
+                if fail_info:
+                    entry.update(fail_info)
+                f.write(json.dumps(entry) + "\n")
+                count += 1
+        self.logger.info(f"Wrote {count} run records to: {runs_file}")
+        return test_case_logs
+
+    def _bucket_failures(self, failures):
+        """
+        按归一化签名对失败运行分桶，同一根因的大量失败归为一桶，便于发现新出现的少量失败
+        :param failures: 失败运行列表（含 signature 字段）
+        :return: 按失败次数降序排列的桶列表，代表日志取桶内最短的日志
+        """
+        buckets = {}
+        for failure in failures:
+            signature = failure.get("signature") or "no signature"
+            try:
+                size = os.path.getsize(failure["log_path"])
+            except OSError:
+                size = float("inf")
+            bucket = buckets.setdefault(signature, {"signature": signature, "count": 0, "modes": [],
+                                                    "test_cases": {}, "representative_log": None, "_size": None})
+            bucket["count"] += 1
+            if failure["mode"] not in bucket["modes"]:
+                bucket["modes"].append(failure["mode"])
+            test_cases = bucket["test_cases"]
+            test_cases[failure["test_case"]] = test_cases.get(failure["test_case"], 0) + 1
+            if bucket["_size"] is None or size < bucket["_size"]:
+                bucket["representative_log"], bucket["_size"] = failure["log_path"], size
+
+        result = sorted(buckets.values(), key=lambda bucket: -bucket["count"])
+        for bucket in result:
+            del bucket["_size"]
+        return result
+
+    def _previous_failed_modes(self):
+        """
+        :return: 上一次报告记录的编译失败模式（--rerun_failed 重新生成报告时沿用），不存在时为空
         """
         try:
-            # 构造 grep 命令：先排除模式，再匹配错误
-            cmd = f"grep -vE '{self.exclusion_patterns}' {log_path} | grep -E '{self.error_patterns}'"
-
-            # 执行 grep 命令并获取结果
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-            )
-
-            # 如果返回码为 0，说明命中错误关键词
-            return result.returncode == 0
-        except Exception as e:
-            self.logger.error(f"Error while processing log file {log_path}: {e}")
-            return False
+            return ReportReader(self.result_path).summary().get("failed_modes", {})
+        except (FileNotFoundError, ValueError):
+            return {}
 
-    def generate_final_report(self):
+    def generate_final_report(self, failed_modes=None):
         """
         收集日志和仿真结果，结合覆盖率数据、编译结果和回归统计，生成最终的综合报告
+        :param failed_modes: 编译失败的模式 {mode: 错误信息}，None 表示沿用上一次报告中的记录
         """
         final_report = {"modes": {}}  # 初始化最终报告结构
+        if failed_modes is None:
+            failed_modes = self._previous_failed_modes()
 
         # Initialize regression_result.log content
         regression_results = []
 
+        # 测试用例结果：所有模式的运行结果单遍流式处理，jsonl 格式下逐条写入 report_runs.jsonl
+        streaming = self.gconf.report_format == "jsonl"
+        stats_by_mode, test_case_logs = {}, {}
+        try:
+            stats_by_mode, runs = self._collect_runs(regression_results)
+            test_case_logs = self._write_runs(runs)
+        except Exception as e:
+            self.logger.error(f"Error collecting run results: {str(e)}")
+
+        # 冒烟门控结果（--smoke_gate）
+        smoke_gate = {}
+        smoke_gate_file = os.path.join(self.result_path, "smoke_gate.json")
+        if os.path.exists(smoke_gate_file):
+            with open(smoke_gate_file, "r") as f:
+                smoke_gate = json.load(f)
+
         for mode in self.gconf.mode:
             self.logger.info(f"Generating report for mode: {mode}")
             mode_report = {
@@ -88,67 +329,62 @@ class ReportGenerator:
                         "log_file": "cmp.log",
                         "status": "fail" if has_errors else "pass",
                     }
+                    # 覆盖率开/关双镜像、自动波形镜像等额外镜像
+                    for ccov, wave in self.gconf.builds[1:]:
+                        build = self.gconf.build_name(ccov, wave)
+                        build_log = os.path.join(log_dir, f"cmp_{build}.log")
+                        if os.path.exists(build_log):
+                            mode_report["compilation"].setdefault("builds", {})[build] = {
+                                "log_file": f"cmp_{build}.log",
+                                "status": "fail" if self.log_contains_error(build_log) else "pass",
+                            }
                 else:
                     self.logger.warning(f"Compilation log not found for mode: {mode}")
             except Exception as e:
                 self.logger.error(f"Error processing compilation log for mode {mode}: {str(e)}")
 
-            # 测试用例日志处理
-            try:
-                if os.path.exists(log_dir):
-                    logs = [log for log in os.listdir(log_dir) if log.endswith(".log") and log != "cmp.log"]
-                    test_case_logs = []  # 存放日志文件解析结果
-                    stats_summary = {}  # 统计结果
-
-                    for log in logs:
-                        # 假设日志文件名格式为 "<用例名>_<seed>.log"
-                        match = re.match(r"^(.*)_([0-9]+)\.log$", log)
-                        if match:
-                            test_case = match.group(1)  # 提取用例名
-                            seed = match.group(2)  # 提取种子
-                            log_path = os.path.join(log_dir, log)
-
-                            # 初始化统计结果
-                            if test_case not in stats_summary:
-                                stats_summary[test_case] = {
-                                    "total_runs": 0,
-                                    "pass_count": 0,
-                                    "fail_count": 0,
-                                }
-
-                            # 更新总运行次数
-                            stats_summary[test_case]["total_runs"] += 1
-
-                            # 是否包含错误
-                            if self.log_contains_error(log_path):
-                                stats_summary[test_case]["fail_count"] += 1
-                                # Add fail information to regression_results
-                                fail_info = {
-                                    "mode": mode,
-                                    "test_case": test_case,
-                                    "log_path": log_path,
-                                    "seed": seed
-                                }
-                                regression_results.append(fail_info)                                
-                            else:
-                                stats_summary[test_case]["pass_count"] += 1
-
-                            # 添加日志文件到结果列表
-                            test_case_logs.append({"test_case": test_case, "seed": seed, "file": log})
-
-                    # 汇总测试用例日志和统计结果
-                    mode_report["results"] = {"test_cases": test_case_logs}
-                    mode_report["statistics"] = stats_summary
-                else:
-                    self.logger.warning(f"Log directory not found for mode: {mode}")
-            except Exception as e:
-                self.logger.error(f"Error collecting log files for mode {mode}: {str(e)}")
+            # 编译失败的模式：以编译阶段的结论为准（返回码非零时日志中未必有错误关键词）
+            if mode in failed_modes:
+                mode_report["compilation"]["status"] = "fail"
+                mode_report["compilation"]["error"] = failed_modes[mode]
+
+            # 汇总测试用例日志和统计结果（jsonl 格式下运行条目位于 report_runs.jsonl）
+            if mode in stats_by_mode or os.path.exists(log_dir):
+                if not streaming:
+                    mode_report["results"] = {"test_cases": test_case_logs.get(mode, [])}
+                mode_report["statistics"] = stats_by_mode.get(mode, {})
+            else:
+                self.logger.warning(f"Log directory not found for mode: {mode}")
+
+            if mode in smoke_gate:
+                mode_report["smoke_gate"] = smoke_gate[mode]
 
             # 添加该模式的报告到最终报告
             final_report["modes"][mode] = mode_report
 
+        # 失败签名分桶
+        failure_buckets = self._bucket_failures(regression_results)
+
         # Write regression_result.log
-        self._write_regression_results(regression_results, mode_report["statistics"], mode_report["coverage"])
+        gated_modes = {mode: gate for mode, gate in smoke_gate.items() if gate["gated"]}
+        self._write_regression_results(regression_results, mode_report["statistics"], mode_report["coverage"],
+                                       gated_modes, failure_buckets, failed_modes)
+
+        # 失败运行列表，供 --rerun_failed 使用；jsonl 格式下失败运行随运行条目写入 report_runs.jsonl，汇总中不再重复
+        if streaming:
+            final_report["format"] = "jsonl"
+            final_report["runs_file"] = ReportReader.RUNS_FILE
+        else:
+            final_report["failures"] = regression_results
+        final_report["failure_buckets"] = failure_buckets
+        final_report["failed_modes"] = failed_modes
+
+        # 分片信息：单个分片记录 k/N，合并结果记录来源分片目录
+        if self.gconf.shard:
+            final_report["shard"] = {"index": self.gconf.shard[0], "count": self.gconf.shard[1],
+                                     "random_seed": self.gconf.random_seed}
+        if self.gconf.merge_shards:
+            final_report["shards"] = [os.path.abspath(shard_dir) for shard_dir in self.gconf.merge_shards]
 
         # 输出最终综合报告为 JSON 文件
         report_file = os.path.join(self.result_path, "final_report.json")
@@ -159,8 +395,9 @@ class ReportGenerator:
         except Exception as e:
             self.logger.error(f"Error writing final report: {str(e)}")
 
-    def _write_regression_results(self, results, stats_summary, coverage_data):
-        """Writes the failed test case information, summary statistics, and coverage data to regression_result.log."""
+    def _write_regression_results(self, results, stats_summary, coverage_data, gated_modes=None, failure_buckets=None,
+                                  failed_modes=None):
+        """Writes the failed test case information, failure signature buckets, summary statistics, coverage data, smoke-gated modes and modes that failed to compile to regression_result.log."""
         log_file = os.path.join(self.result_path, "regression_result.log")
         try:
             with open(log_file, "w") as f:
@@ -168,6 +405,7 @@ class ReportGenerator:
                 total_tests = sum(stats.get("total_runs", 0) for stats in stats_summary.values())
                 total_passed = sum(stats.get("pass_count", 0) for stats in stats_summary.values())
                 total_failed = sum(stats.get("fail_count", 0) for stats in stats_summary.values())
+                total_license = sum(stats.get("license_count", 0) for stats in stats_summary.values())
                 pass_rate = (total_passed / total_tests) * 100 if total_tests else 0
 
                 f.write("+-----------------+-------+\n")
@@ -176,6 +414,8 @@ class ReportGenerator:
                 f.write(f"| Total Test Cases | {total_tests:<5} |\n")
                 f.write(f"| Passed          | {total_passed:<5} |\n")
                 f.write(f"| Failed          | {total_failed:<5} |\n")
+                if total_license:
+                    f.write(f"| License Blocked | {total_license:<5} |\n")
                 f.write(f"| Pass Rate (%)   | {pass_rate:5.2f} |\n")
                 f.write("+-----------------+-------+\n")
                 f.write("\n")
@@ -192,6 +432,43 @@ class ReportGenerator:
                     f.write("+-----------------+-------+\n")
                     f.write("\n")
 
+                # 被冒烟门控取消的模式
+                if gated_modes:
+                    f.write("+-------------+----------------+--------------+\n")
+                    f.write("| Gated Mode  | Smoke Failures | Skipped Runs |\n")
+                    f.write("+-------------+----------------+--------------+\n")
+                    for mode, gate in gated_modes.items():
+                        failures = f"{gate['smoke_failures']}/{gate['smoke_runs']}"
+                        f.write(f"| {mode:<11} | {failures:<14} | {gate['skipped_runs']:<12} |\n")
+                    f.write("+-------------+----------------+--------------+\n")
+                    f.write("\n")
+
+                # 编译失败、未进入仿真的模式
+                if failed_modes:
+                    f.write("+-------------+-------------------------------------------------+\n")
+                    f.write("| Failed Mode |                Compilation Error                |\n")
+                    f.write("+-------------+-------------------------------------------------+\n")
+                    for mode, error in failed_modes.items():
+                        f.write(f"| {mode:<11} | {str(error):<47} |\n")
+                    f.write("+-------------+-------------------------------------------------+\n")
+                    f.write("\n")
+
+                # 失败签名分桶：每个桶一行签名，下一行为涉及的用例与代表日志
+                if failure_buckets:
+                    f.write("+-------+------------------------------------------------------------------------------+\n")
+                    f.write("| Count |                             Failure Signature                                |\n")
+                    f.write("+-------+------------------------------------------------------------------------------+\n")
+                    for bucket in failure_buckets:
+                        signature = bucket["signature"]
+                        if len(signature) > 76:
+                            signature = signature[:73] + "..."
+                        test_cases = ", ".join(f"{tc} x{count}" for tc, count in bucket["test_cases"].items())
+                        f.write(f"| {bucket['count']:<5} | {signature:<76} |\n")
+                        f.write(f"| {'':5} | tests: {test_cases}\n")
+                        f.write(f"| {'':5} | log:   {bucket['representative_log']}\n")
+                    f.write("+-------+------------------------------------------------------------------------------+\n")
+                    f.write("\n")
+
                 # 修复：确保失败测试用例表格在with块内
                 if results:
                     f.write("+-------------+-------------+------------+-------------------------------------------------+\n")
@@ -204,6 +481,8 @@ class ReportGenerator:
                         log_path = str(result.get('log_path', '')).ljust(47)
 
                         f.write(f"| {mode} | {test_case} | {seed} | {log_path} |\n")
+                        if result.get("wave"):
+                            f.write(f"| {'':11} | {'':11} | {'wave':<10} | {str(result['wave']).ljust(47)} |\n")
                     f.write("+-------------+-------------+------------+-------------------------------------------------+\n")
 
             self.logger.info(f"Regression results logged to: {log_file}")
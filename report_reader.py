@@ -0,0 +1,110 @@
+import os
+import json
+
+
+class ReportReader:
+    """
+    最终报告读取接口，兼容两种报告格式：
+    jsonl：final_report.json 为汇总，每次运行一行写入 report_runs.jsonl，逐行读取，不整体加载
+    json：原有格式，运行条目位于 final_report.json 的 modes.<mode>.results.test_cases，失败运行位于 failures
+    """
+
+    SUMMARY_FILE = "final_report.json"
+    RUNS_FILE = "report_runs.jsonl"
+
+    def __init__(self, result_path):
+        """
+        :param result_path: 回归目录
+        """
+        self.result_path = result_path
+        self.summary_path = os.path.join(result_path, self.SUMMARY_FILE)
+        self._summary = None
+
+    def summary(self):
+        """
+        :return: final_report.json 内容（jsonl 格式下只包含汇总）
+        """
+        if self._summary is None:
+            if not os.path.exists(self.summary_path):
+                raise FileNotFoundError(f"{self.SUMMARY_FILE} not found in {self.result_path}, "
+                                        f"run a regression first!")
+            with open(self.summary_path, "r") as f:
+                self._summary = json.load(f)
+        return self._summary
+
+    @property
+    def streaming(self):
+        return self.summary().get("format") == "jsonl"
+
+    def iter_runs(self, mode=None, status=None):
+        """
+        逐条产生运行条目：{"mode", "test_case", "seed", "file", "status", ...}，失败运行另含 log_path、signature 等字段
+        :param mode: 只产生该模式的运行，None 表示全部
+        :param status: 只产生该状态的运行（PASS/FAIL/TIMEOUT/...），None 表示全部
+        """
+        if self.streaming:
+            runs = self._iter_stream()
+        else:
+            runs = self._iter_summary()
+        for run in runs:
+            if (mode is None or run["mode"] == mode) and (status is None or run.get("status") == status):
+                yield run
+
+    def _iter_stream(self):
+        runs_file = os.path.join(self.result_path, self.summary().get("runs_file", self.RUNS_FILE))
+        with open(runs_file, "r") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # 中断时写了一半的行
+
+    def _iter_summary(self):
+        # 旧格式中由日志扫描得到的运行条目没有状态字段，依据失败列表补充
+        summary = self.summary()
+        failures = {(failure["mode"], failure["test_case"], str(failure["seed"])): failure
+                    for failure in summary.get("failures", [])}
+        for mode, mode_report in summary.get("modes", {}).items():
+            for run in mode_report.get("results", {}).get("test_cases", []):
+                failure = failures.get((mode, run["test_case"], str(run["seed"])))
+                entry = dict(run, mode=mode)
+                entry.setdefault("status", failure.get("status", "FAIL") if failure else "PASS")
+                if failure:
+                    entry.update(failure)
+                yield entry
+
+    def failures(self):
+        """
+        :return: 失败运行列表 [{"mode", "test_case", "seed", "log_path", ...}, ...]，供 --rerun_failed 使用
+        """
+        if not self.streaming:
+            return self.summary().get("failures", [])
+        return [run for run in self._iter_stream() if run.get("status") not in ("PASS", "SKIPPED")]
+
+    def statistics(self, by=("mode", "test_case"), mode=None):
+        """
+        流式聚合运行统计，内存占用只与分组数有关
+        :param by: 分组字段，例如 ("mode", "test_case")、("signature",)、("status",)
+        :param mode: 只统计该模式，None 表示全部
+        :return: {分组键元组: {"total_runs", "pass_count", "fail_count", "skip_count", "license_count", "duration"}}
+                 跳过的运行与 license checkout 失败的运行不计入 total_runs
+        """
+        stats = {}
+        for run in self.iter_runs(mode=mode):
+            key = tuple(run.get(field) for field in by)
+            entry = stats.setdefault(key, {"total_runs": 0, "pass_count": 0, "fail_count": 0,
+                                           "skip_count": 0, "license_count": 0, "duration": 0.0})
+            status = run.get("status")
+            if status == "SKIPPED":
+                entry["skip_count"] += 1
+                continue
+            if status == "LICENSE":
+                entry["license_count"] += 1
+                continue
+            entry["total_runs"] += 1
+            if status == "PASS":
+                entry["pass_count"] += 1
+            else:
+                entry["fail_count"] += 1
+            entry["duration"] += run.get("duration") or 0.0
+        return stats
@@ -0,0 +1,74 @@
+import os
+import json
+
+
+class ResultsIndex:
+    """
+    回归结果索引（追加写入的 JSON Lines）：每次运行结束时由仿真引擎写入一条紧凑记录，报告阶段据此生成，无需重新扫描日志
+    记录字段：mode, tc, seed, run_idx, status, duration, signature, log（相对回归目录的路径）
+    向已有索引追加的进程（--resume、--rerun_failed）写入的记录带 rerun 字段，读取时只需对这些运行去重
+    """
+
+    FILE_NAME = "results_index.jsonl"
+
+    def __init__(self, result_path, logger):
+        """
+        :param result_path: 回归目录
+        :param logger: 日志记录器
+        """
+        self.path = os.path.join(result_path, self.FILE_NAME)
+        self.logger = logger
+        self._file = None
+        self._rerun = False
+        self.enabled = True  # False 时不写入索引，报告回退为扫描日志
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def append(self, mode, tc, seed, run_idx, status, duration, signature, log):
+        if not self.enabled:
+            return
+        if self._file is None:
+            self._rerun = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+            self._file = open(self.path, "a")
+        record = {"mode": mode, "tc": tc, "seed": seed, "run_idx": run_idx, "status": status,
+                  "duration": round(duration, 3), "signature": signature, "log": log}
+        if self._rerun:
+            record["rerun"] = True
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def _parse(line):
+        try:
+            record = json.loads(line)
+            return record, (record["mode"], record["tc"], record["seed"])
+        except (ValueError, KeyError, TypeError):
+            return None, None  # 中断时写了一半的行
+
+    def iter_records(self):
+        """
+        流式读取索引；同一 (mode, tc, seed) 多次运行（例如 --rerun_failed）时以最后一条为准
+        读取两遍：第一遍只记录带 rerun 字段的运行最后一条记录的行号，第二遍逐条产生记录并跳过被重跑覆盖的记录，
+        内存占用只与重跑的运行数有关
+        :return: 记录迭代器，按文件中的顺序产生
+        """
+        reruns = {}
+        with open(self.path, "r") as f:
+            for line_no, line in enumerate(f):
+                if '"rerun": true' in line:
+                    record, key = self._parse(line)
+                    if key is not None and record.get("rerun"):
+                        reruns[key] = line_no
+        self.logger.info(f"Reading run records from: {self.path} ({len(reruns)} rerun)")
+
+        with open(self.path, "r") as f:
+            for line_no, line in enumerate(f):
+                record, key = self._parse(line)
+                if key is not None and reruns.get(key, line_no) == line_no:
+                    yield record
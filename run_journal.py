@@ -0,0 +1,87 @@
+import os
+import json
+import time
+
+
+class RunJournal:
+    """
+    仿真运行日志（追加写入的 JSON Lines），记录每次运行的计划、开始与结束，用于 --resume 断点续跑
+    每条记录写入后立即 fsync，进程崩溃或主机重启后最多丢失正在写入的最后一行
+    """
+
+    def __init__(self, path, logger):
+        """
+        :param path: 日志文件路径，例如 ../<name>/run_journal.jsonl
+        :param logger: 日志记录器
+        """
+        self.path = path
+        self.logger = logger
+        self._file = None
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a+")
+            # 上次崩溃可能留下不完整的最后一行，补一个换行避免与新记录粘连
+            if self._file.tell() > 0:
+                self._file.seek(self._file.tell() - 1)
+                if self._file.read(1) != "\n":
+                    self._file.write("\n")
+        return self._file
+
+    def _append(self, records):
+        f = self._open()
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def plan(self, runs):
+        """
+        记录待执行的运行及其种子
+        :param runs: [(mode, tc, run_idx, seed), ...]
+        """
+        now = time.time()
+        self._append({"event": "plan", "mode": mode, "tc": tc, "run_idx": run_idx, "seed": seed, "time": now}
+                     for mode, tc, run_idx, seed in runs)
+
+    def start(self, mode, tc, run_idx, seed):
+        self._append([{"event": "start", "mode": mode, "tc": tc, "run_idx": run_idx, "seed": seed,
+                       "time": time.time()}])
+
+    def finish(self, mode, tc, run_idx, seed, status):
+        self._append([{"event": "finish", "mode": mode, "tc": tc, "run_idx": run_idx, "seed": seed,
+                       "status": status, "time": time.time()}])
+
+    def replay(self):
+        """
+        回放日志
+        :return: (seeds, finished)
+                 seeds: {(mode, tc, run_idx): seed}，已计划或已开始的运行使用的种子
+                 finished: {(mode, tc, run_idx): status}，已结束的运行
+        """
+        seeds, finished = {}, {}
+        if not os.path.exists(self.path):
+            self.logger.warning(f"Run journal not found, nothing to resume: {self.path}")
+            return seeds, finished
+
+        with open(self.path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    key = (record["mode"], record["tc"], record["run_idx"])
+                except (ValueError, KeyError, TypeError):
+                    continue  # 崩溃时写了一半的行
+                seeds[key] = record["seed"]
+                if record["event"] == "finish":
+                    finished[key] = record["status"]
+                elif record["event"] == "start":
+                    finished.pop(key, None)
+
+        self.logger.info(f"Replayed run journal {self.path}: {len(finished)} finished, "
+                         f"{len(seeds) - len(finished)} unfinished runs")
+        return seeds, finished
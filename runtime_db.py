@@ -0,0 +1,124 @@
+import os
+import json
+import fcntl
+import threading
+
+
+class RuntimeDB:
+    """
+    仿真运行时长历史数据库，按 (mode, tc, sim_opts) 记录耗时，用于最长任务优先调度
+    数据以 JSON 形式保存在回归根目录下，跨回归累积；多个回归共享同一文件，保存时在文件锁下合并本次新增的记录
+    """
+
+    ALPHA = 0.3  # 指数滑动平均系数，越大越偏向最近一次运行
+
+    def __init__(self, path, logger):
+        """
+        :param path: 数据库文件路径
+        :param logger: 日志记录器
+        """
+        self.path = path
+        self.logger = logger
+        self.records = {}
+        self._pending = []  # 本进程新增、尚未保存的样本 [(key, duration, peak_rss), ...]
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def _key(mode, tc, sim_opts):
+        return f"{mode}|{tc}|{sim_opts or ''}"
+
+    def _read(self):
+        """
+        :return: 文件中的记录，文件不存在或损坏时为空
+        """
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Failed to load runtime database {self.path}: {e}")
+            return {}
+
+    def load(self):
+        """
+        从文件加载历史记录，文件不存在或损坏时从空库开始
+        """
+        self.records = self._read()
+        if self.records:
+            self.logger.info(f"Loaded {len(self.records)} runtime records from: {self.path}")
+
+    def save(self):
+        """
+        在文件锁下重新读取文件，合并本进程新增的样本后原子写回（先写临时文件再重命名），
+        同时运行的其他回归保存的记录不会被覆盖
+        """
+        tmp_path = f"{self.path}.tmp.{os.getpid()}"
+        with self._lock:
+            try:
+                with open(f"{self.path}.lock", "w") as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    records = self._read()
+                    for key, duration, peak_rss in self._pending:
+                        self._apply(records, key, duration, peak_rss)
+                    with open(tmp_path, "w") as f:
+                        json.dump(records, f, indent=4, sort_keys=True)
+                    os.replace(tmp_path, self.path)
+                self.records, self._pending = records, []
+                self.logger.info(f"Runtime database saved: {self.path}")
+            except OSError as e:
+                self.logger.warning(f"Failed to save runtime database {self.path}: {e}")
+
+    @classmethod
+    def _apply(cls, records, key, duration, peak_rss):
+        entry = records.get(key)
+        if entry is None:
+            records[key] = {"avg": duration, "last": duration, "count": 1, "peak_rss": peak_rss}
+        else:
+            entry["avg"] = cls.ALPHA * duration + (1 - cls.ALPHA) * entry["avg"]
+            entry["last"] = duration
+            entry["count"] += 1
+            entry["peak_rss"] = max(entry.get("peak_rss", 0), peak_rss)
+
+    def record(self, mode, tc, sim_opts, duration, peak_rss=0):
+        """
+        记录一次运行耗时（秒）及观测到的峰值 RSS（字节）
+        """
+        key = self._key(mode, tc, sim_opts)
+        with self._lock:
+            self._apply(self.records, key, duration, peak_rss)
+            self._pending.append((key, duration, peak_rss))
+
+    def mode_peak_rss(self, mode):
+        """
+        某模式下所有用例的历史峰值 RSS（字节），无记录时返回 0
+        """
+        prefix = f"{mode}|"
+        with self._lock:
+            return max((entry.get("peak_rss", 0) for key, entry in self.records.items() if key.startswith(prefix)),
+                       default=0)
+
+    def estimate(self, mode, tc, sim_opts):
+        """
+        预估运行耗时（秒）
+        未见过的组合依次回退到：同 mode 同 tc 的均值 -> 同 tc 的均值 -> 全库均值 -> 0
+        """
+        with self._lock:
+            entry = self.records.get(self._key(mode, tc, sim_opts))
+            if entry is not None:
+                return entry["avg"]
+
+            same_mode_tc, same_tc, overall = [], [], []
+            for key, entry in self.records.items():
+                rec_mode, rec_tc, _ = key.split("|", 2)
+                overall.append(entry["avg"])
+                if rec_tc == tc:
+                    same_tc.append(entry["avg"])
+                    if rec_mode == mode:
+                        same_mode_tc.append(entry["avg"])
+
+        for samples in (same_mode_tc, same_tc, overall):
+            if samples:
+                return sum(samples) / len(samples)
+        return 0.0
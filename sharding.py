@@ -0,0 +1,133 @@
+import os
+import random
+import shutil
+import hashlib
+from utils import link_or_copy
+from results_index import ResultsIndex
+from report_reader import ReportReader
+
+
+def parse_shard(text):
+    """
+    解析 --shard 参数
+    :param text: "k/N" 形式，k 从 1 开始
+    :return: (k, N)，text 为空时返回 None
+    """
+    if not text:
+        return None
+    try:
+        index, count = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"[ERROR] Invalid --shard '{text}', expected k/N (e.g. 2/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"[ERROR] Invalid --shard '{text}', k must be within 1..N")
+    return index, count
+
+
+def shard_seed(random_seed, mode, tc, run_idx):
+    """
+    分片回归中由 --random_seed 派生的确定性仿真种子，保证各主机展开出相同的运行列表
+    """
+    digest = hashlib.sha256(f"{random_seed}|{mode}|{tc}|{run_idx}".encode()).digest()
+    return int.from_bytes(digest[:4], "big")
+
+
+def select_shard(runs, shard, random_seed, key):
+    """
+    确定性划分运行列表：按规范顺序排序后用 --random_seed 打乱，第 k 个分片取下标 k-1, k-1+N, ...
+    N 个分片之间无重叠且合起来覆盖完整列表，各分片规模相差不超过 1
+    :param runs: 完整运行列表
+    :param shard: (k, N)
+    :param random_seed: 打乱使用的随机种子
+    :param key: 返回运行规范排序键的函数
+    :return: 属于第 k 个分片的运行
+    """
+    index, count = shard
+    ordered = sorted(runs, key=key)
+    random.Random(random_seed).shuffle(ordered)
+    return ordered[index - 1::count]
+
+
+class ShardMerger:
+    """
+    合并多个分片回归目录：日志目录、运行日志、覆盖率数据，并生成统一的 final_report.json
+    """
+
+    def __init__(self, gconf, coverage, reporter):
+        """
+        :param gconf: GConf 实例（result_path 为合并后的回归目录）
+        :param coverage: CoverageManager 实例
+        :param reporter: ReportGenerator 实例
+        """
+        self.gconf = gconf
+        self.logger = gconf.logger
+        self.result_path = gconf.result_path
+        self.coverage = coverage
+        self.reporter = reporter
+
+    def _merge_logs(self, shard_dir, mode):
+        """
+        将分片的仿真日志硬链接（或复制）到合并目录，编译日志（cmp*.log）只保留第一个分片的
+        :return: 合并的日志文件数
+        """
+        src_log_dir = os.path.join(shard_dir, mode, "log")
+        if not os.path.isdir(src_log_dir):
+            self.logger.warning(f"Log directory not found in shard: {src_log_dir}")
+            return 0
+
+        dst_log_dir = os.path.join(self.result_path, mode, "log")
+        os.makedirs(dst_log_dir, exist_ok=True)
+        merged = 0
+        for name in os.listdir(src_log_dir):
+            dst = os.path.join(dst_log_dir, name)
+            if os.path.exists(dst):
+                if not self.reporter.CMP_LOG_REGEX.match(name):
+                    self.logger.warning(f"Duplicate log across shards, keeping first: {name}")
+                continue
+            link_or_copy(os.path.join(src_log_dir, name), dst)
+            merged += 1
+        return merged
+
+    def _concat(self, shard_dirs, name):
+        """
+        拼接各分片的 JSON Lines 文件（运行日志、结果索引），使合并目录同样支持 --rerun_failed 与基于索引的报告
+        """
+        with open(os.path.join(self.result_path, name), "w") as out:
+            for shard_dir in shard_dirs:
+                path = os.path.join(shard_dir, name)
+                if os.path.exists(path):
+                    with open(path, "r") as f:
+                        shutil.copyfileobj(f, out)
+
+    def merge(self, shard_dirs):
+        """
+        合并分片并生成报告
+        :param shard_dirs: 各分片的回归目录
+        """
+        missing = [shard_dir for shard_dir in shard_dirs if not os.path.isdir(shard_dir)]
+        if missing:
+            raise FileNotFoundError(f"Shard directories not found: {missing}")
+
+        self.logger.info(f"Merging {len(shard_dirs)} shards into: {self.result_path}")
+        for mode in self.gconf.mode:
+            merged = sum(self._merge_logs(shard_dir, mode) for shard_dir in shard_dirs)
+            self.logger.info(f"Merged {merged} log files for mode: {mode}")
+
+            if not self.gconf.skip_cov_gen:
+                cov_dirs = [os.path.abspath(os.path.join(shard_dir, mode, "cov")) for shard_dir in shard_dirs]
+                cov_dirs = [cov_dir for cov_dir in cov_dirs if os.path.isdir(cov_dir)]
+                if not self.coverage.merge_coverage(mode, cov_dirs):
+                    self.logger.error(f"Failed to merge coverage for mode: {mode}")
+
+        self._concat(shard_dirs, "run_journal.jsonl")
+        self._concat(shard_dirs, ResultsIndex.FILE_NAME)
+
+        # 任一分片编译失败的模式在合并报告中同样记为编译失败
+        failed_modes = {}
+        for shard_dir in shard_dirs:
+            reader = ReportReader(shard_dir)
+            if not os.path.exists(reader.summary_path):
+                continue
+            for mode, error in reader.summary().get("failed_modes", {}).items():
+                failed_modes.setdefault(mode, error)
+        self.reporter.generate_final_report(failed_modes)
@@ -0,0 +1,22 @@
+import re
+
+# 随种子/运行变化的部分：文件路径的目录部分、仿真时间、十六进制与 Verilog 常量、十进制数
+_PATH_DIR = re.compile(r"(?<![\w)\]])(?:~|\.{1,2})?/(?:[\w.+-]+/)*(?=[\w.+-])")
+_SIM_TIME = re.compile(r"@\s*[0-9][0-9_.]*\s*(?:[munpf]?s\b)?")
+_HEX = re.compile(r"\b0[xX][0-9a-fA-F_]+\b|\b[0-9]*'[sS]?[bBoOdDhH][0-9a-fA-FxXzZ_?]+\b|\b(?=[0-9a-fA-F]*[0-9])[0-9a-fA-F]{8,}\b")
+_NUMBER = re.compile(r"[0-9]+(?:\.[0-9]+)?")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_signature(line):
+    """
+    归一化错误行：去除路径、仿真时间、数值、地址等随种子或回归目录变化的部分，使同一根因的失败得到相同签名
+    路径只保留文件名，例如 /a/b/scb.sv(12) 归一化为 scb.sv(<N>)
+    :param line: 日志中的错误行
+    :return: 归一化后的签名
+    """
+    signature = _PATH_DIR.sub("", line.strip())
+    signature = _SIM_TIME.sub("@<T>", signature)
+    signature = _HEX.sub("<H>", signature)
+    signature = _NUMBER.sub("<N>", signature)
+    return _SPACE.sub(" ", signature)
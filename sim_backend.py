@@ -0,0 +1,373 @@
+import os
+import re
+import sys
+import shlex
+import asyncio
+import subprocess
+from utils import kill_process_group_async
+
+
+class LocalJob:
+    """
+    本地进程作业
+    """
+
+    def __init__(self, process):
+        self.process = process
+        self.pid = process.pid
+
+    @property
+    def returncode(self):
+        return self.process.returncode
+
+
+class LocalBackend:
+    """
+    本地执行后端：在本机以独立进程组启动命令，标准输出直接写入文件
+    """
+
+    name = "local"
+    supports_admission = True
+    supports_direct_exec = True
+
+    def __init__(self, gconf):
+        self.logger = gconf.logger
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def submit(self, cmd, cwd, out_file, env=None):
+        """
+        启动命令
+        :param env: 子进程环境变量，None 时继承当前环境
+        :return: LocalJob
+        """
+        with open(out_file, "wb") as out:
+            process = await asyncio.create_subprocess_exec(
+                *cmd, cwd=cwd, env=env, stdout=out, stderr=subprocess.STDOUT, start_new_session=True
+            )
+        return LocalJob(process)
+
+    async def wait_started(self, job):
+        """
+        本地作业提交即开始运行
+        """
+
+    def poll(self, job):
+        """
+        :return: 返回码；仍在运行时返回 None
+        """
+        return job.returncode
+
+    async def wait(self, job, timeout):
+        """
+        等待作业结束
+        :return: 返回码；超过 timeout 仍未结束时返回 None
+        """
+        try:
+            return await asyncio.wait_for(job.process.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def kill(self, job):
+        """
+        终止作业所在的整个进程组
+        """
+        await kill_process_group_async(job.process)
+
+
+class BatchJob:
+    """
+    批处理队列中的数组作业成员
+    """
+
+    def __init__(self, cmd, cwd, out_file):
+        # 作业在计算节点上执行，路径须为绝对路径
+        self.cmd = cmd
+        self.cwd = os.path.abspath(cwd)
+        self.out_file = os.path.abspath(out_file)
+        self.rc_file = f"{self.out_file}.rc"
+        self.start_file = f"{self.out_file}.start"
+        self.pid = None
+        self.job_id = None
+        self.index = None
+        self.returncode = None
+        self.started = asyncio.get_running_loop().create_future()
+        self.done = asyncio.get_running_loop().create_future()
+
+    def start(self):
+        if not self.started.done():
+            self.started.set_result(True)
+
+    def finish(self, returncode):
+        if not self.done.done():
+            self.returncode = returncode
+            self.done.set_result(returncode)
+
+
+class BatchBackend:
+    """
+    批处理队列执行后端基类（LSF / SLURM 风格）
+    在 BATCH_WINDOW 内提交的作业合并为一个数组作业整体提交；每个数组成员开始运行时在共享文件系统上
+    写出 <out>.start 标记，运行完成后写出 <out>.rc 返回码文件，后端轮询这些文件判断开始与完成，与具体调度器的查询命令无关
+    """
+
+    name = "batch"
+    supports_admission = False
+    supports_direct_exec = False
+    INDEX_VAR = None       # 调度器提供的数组下标环境变量
+    BATCH_WINDOW = 1.0     # 合并提交的时间窗口（秒）
+    BATCH_MAX = 1000       # 单个数组作业的最大成员数
+    POLL_INTERVAL = 2.0    # 轮询返回码文件的间隔（秒）
+
+    def __init__(self, gconf):
+        self.gconf = gconf
+        self.logger = gconf.logger
+        self.script_dir = os.path.abspath(os.path.join(gconf.result_path, "batch"))
+        bsb_opts = gconf.bsb_opts
+        self.opts = shlex.split(bsb_opts) if bsb_opts and bsb_opts != "Local Machine" else []
+
+        self._pending = []
+        self._running = set()
+        self._array_count = 0
+        self._flush_handle = None
+        self._poller = None
+        self._flushes = set()
+
+    def submit_cmd(self, script, size):
+        raise NotImplementedError
+
+    def parse_job_id(self, output):
+        raise NotImplementedError
+
+    def kill_cmd(self, job):
+        raise NotImplementedError
+
+    async def open(self):
+        self._pending, self._running, self._flushes = [], set(), set()
+        self._poller = asyncio.get_running_loop().create_task(self._poll_loop())
+
+    async def close(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        if self._poller is not None:
+            self._poller.cancel()
+            self._poller = None
+
+    async def submit(self, cmd, cwd, out_file):
+        """
+        将作业加入待提交数组，满 BATCH_MAX 或时间窗口到期时整体提交
+        :return: BatchJob
+        """
+        job = BatchJob(cmd, cwd, out_file)
+        self._pending.append(job)
+        if len(self._pending) >= self.BATCH_MAX:
+            self._start_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.BATCH_WINDOW, self._start_flush)
+        return job
+
+    def _start_flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        jobs = [job for job in self._pending if not job.done.done()]
+        self._pending = []
+        if jobs:
+            task = asyncio.get_running_loop().create_task(self._flush(jobs))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    def _write_array_script(self, jobs):
+        """
+        生成数组作业脚本：按下标执行对应命令，开始时写出 start 标记，输出写入 out 文件，返回码原子写入 rc 文件
+        """
+        os.makedirs(self.script_dir, exist_ok=True)
+        self._array_count += 1
+        script = os.path.join(self.script_dir, f"array_{os.getpid()}_{self._array_count}.sh")
+        with open(script, "w") as f:
+            f.write("#!/bin/bash\n")
+            f.write(f"case \"${{{self.INDEX_VAR}}}\" in\n")
+            for index, job in enumerate(jobs, start=1):
+                rc_tmp = shlex.quote(f"{job.rc_file}.tmp")
+                f.write(f"{index}) cd {shlex.quote(job.cwd)} && touch {shlex.quote(job.start_file)} && {shlex.join(job.cmd)} "
+                        f"> {shlex.quote(job.out_file)} 2>&1; echo $? > {rc_tmp} "
+                        f"&& mv {rc_tmp} {shlex.quote(job.rc_file)} ;;\n")
+            f.write("esac\n")
+        os.chmod(script, 0o755)
+        return script
+
+    async def _flush(self, jobs):
+        """
+        以单个数组作业提交一批作业
+        """
+        for job in jobs:
+            for stale in (job.rc_file, job.start_file):
+                if os.path.exists(stale):
+                    os.remove(stale)
+        script = self._write_array_script(jobs)
+        cmd = self.submit_cmd(script, len(jobs))
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+            )
+            output = (await process.communicate())[0].decode(errors="replace")
+            job_id = self.parse_job_id(output) if process.returncode == 0 else None
+        except OSError as e:
+            output, job_id = str(e), None
+
+        if job_id is None:
+            self.logger.error(f"[{self.name}] Array submission failed ({' '.join(cmd)}): {output.strip()}")
+            for job in jobs:
+                with open(job.out_file, "w") as out:
+                    out.write(f"[ERROR] {self.name} submission failed: {output.strip()}\n")
+                job.finish(127)
+            return
+
+        self.logger.info(f"[{self.name}] Submitted array job {job_id} with {len(jobs)} runs: {script}")
+        for index, job in enumerate(jobs, start=1):
+            job.job_id, job.index = job_id, index
+            if not job.done.done():
+                self._running.add(job)
+
+    def poll(self, job):
+        """
+        检查作业的开始标记与返回码文件
+        :return: 返回码；仍在排队或运行时返回 None
+        """
+        if job.done.done():
+            self._running.discard(job)
+            return job.returncode
+        if not job.started.done() and os.path.exists(job.start_file):
+            job.start()
+        try:
+            with open(job.rc_file, "r") as f:
+                returncode = int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+        self._running.discard(job)
+        job.start()  # 运行时间短于轮询间隔时可能未观察到开始标记
+        job.finish(returncode)
+        return returncode
+
+    async def _poll_loop(self):
+        """
+        轮询运行中作业的开始标记与返回码文件
+        """
+        while True:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            for job in list(self._running):
+                self.poll(job)
+
+    async def wait_started(self, job):
+        """
+        等待作业离开调度器队列开始运行（或未运行即结束，例如提交失败、被终止），排队时间不计入超时
+        """
+        await asyncio.wait([job.started, job.done], return_when=asyncio.FIRST_COMPLETED)
+
+    async def wait(self, job, timeout):
+        """
+        等待作业结束；超时前再检查一次返回码文件，避免在两次轮询之间结束的作业被误判为超时
+        :return: 返回码；超过 timeout 仍未结束时返回 None
+        """
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.done), timeout)
+        except asyncio.TimeoutError:
+            return self.poll(job)
+
+    async def kill(self, job):
+        """
+        通过调度器终止数组成员；尚未提交的作业直接取消
+        """
+        if job.job_id is not None:
+            process = await asyncio.create_subprocess_exec(
+                *self.kill_cmd(job), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            await process.wait()
+        self._running.discard(job)
+        job.finish(-9)
+
+
+class LsfBackend(BatchBackend):
+    """
+    LSF 后端：bsub 作业数组
+    """
+
+    name = "lsf"
+    INDEX_VAR = "LSB_JOBINDEX"
+
+    def submit_cmd(self, script, size):
+        return ["bsub", "-J", f"regr[1-{size}]", "-o", "/dev/null", *self.opts, script]
+
+    def parse_job_id(self, output):
+        match = re.search(r"Job <(\d+)>", output)
+        return match.group(1) if match else None
+
+    def kill_cmd(self, job):
+        return ["bkill", f"{job.job_id}[{job.index}]"]
+
+
+class SlurmBackend(BatchBackend):
+    """
+    SLURM 后端：sbatch --array
+    """
+
+    name = "slurm"
+    INDEX_VAR = "SLURM_ARRAY_TASK_ID"
+
+    def submit_cmd(self, script, size):
+        return ["sbatch", f"--array=1-{size}", "--parsable", "-o", "/dev/null", *self.opts, script]
+
+    def parse_job_id(self, output):
+        match = re.match(r"\s*(\d+)", output)
+        return match.group(1) if match else None
+
+    def kill_cmd(self, job):
+        return ["scancel", f"{job.job_id}_{job.index}"]
+
+
+class FakeBackend(BatchBackend):
+    """
+    本地模拟调度器后端，配合 fake_scheduler.py 守护进程使用，用于在无 LSF/SLURM 的环境中验证批处理流程
+    """
+
+    name = "fake"
+    INDEX_VAR = "FAKE_ARRAY_INDEX"
+    CLIENT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_scheduler.py")
+
+    def __init__(self, gconf):
+        super().__init__(gconf)
+        self.socket_path = gconf.fake_scheduler_socket
+
+    def submit_cmd(self, script, size):
+        return [sys.executable, self.CLIENT, "submit", "--socket", self.socket_path, "--array", str(size), script]
+
+    def parse_job_id(self, output):
+        match = re.search(r"Job <(\d+)>", output)
+        return match.group(1) if match else None
+
+    def kill_cmd(self, job):
+        return [sys.executable, self.CLIENT, "kill", "--socket", self.socket_path, f"{job.job_id}[{job.index}]"]
+
+
+BACKENDS = {
+    "local": LocalBackend,
+    "lsf": LsfBackend,
+    "slurm": SlurmBackend,
+    "fake": FakeBackend,
+}
+
+
+def create_backend(gconf):
+    """
+    根据 --backend 创建执行后端
+    """
+    if gconf.backend not in BACKENDS:
+        raise ValueError(f"Unknown execution backend: {gconf.backend}")
+    return BACKENDS[gconf.backend](gconf)
@@ -1,26 +1,237 @@
 import os
-import subprocess
+import re
+import sys
+import time
+import shlex
+import asyncio
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from log_watcher import LogWatcher
+from runtime_db import RuntimeDB
+from admission import AdmissionController
+from sim_backend import create_backend
+from run_journal import RunJournal
+from sharding import shard_seed, select_shard
+from recipe_cache import RecipeCache
+from smoke_gate import SmokeGate
+from license_pool import LicensePool
+from signature import normalize_signature
+from log_classifier import LogClassifier
+from results_index import ResultsIndex
+
+# 单次仿真运行状态
+RUN_PASS = "PASS"
+RUN_FAIL = "FAIL"
+RUN_TIMEOUT = "TIMEOUT"
+RUN_ABORTED = "ABORTED"  # 被日志监视器提前终止
+RUN_SKIPPED = "SKIPPED"  # 未执行（例如所属模式被冒烟门控取消）
+RUN_LICENSE = "LICENSE"  # license checkout 失败（重新排队次数用尽）
+RUN_FAILED = (RUN_FAIL, RUN_TIMEOUT, RUN_ABORTED)  # 仿真本身失败的状态
+
+
+def _use_pidfd_child_watcher():
+    """
+    Python 3.12 之前默认的子进程监视器为每个子进程占用一个等待线程，
+    内核支持 pidfd 时改用 PidfdChildWatcher，使大量并发仿真不再对应大量线程
+    须在事件循环内调用
+    """
+    if sys.version_info >= (3, 12) or not hasattr(asyncio, "PidfdChildWatcher"):
+        return
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except (AttributeError, OSError):
+        return
+    watcher = asyncio.PidfdChildWatcher()
+    watcher.attach_loop(asyncio.get_running_loop())
+    asyncio.set_child_watcher(watcher)
 
 
 class SimulationManager:
     """
     仿真任务管理器，使用 make ncrun 提交仿真测试用例
+    所有仿真运行由单个 asyncio 事件循环驱动，并发数由信号量限制，实际执行由可插拔后端（本地/批处理队列）完成
     """
 
+    WATCH_INTERVAL = 0.5  # 日志监视轮询间隔（秒）
+    WATCH_MAX_BYTES = 8 * 1024 * 1024  # 每次轮询最多扫描的日志字节数，避免阻塞事件循环
+    LICENSE_SCAN_BYTES = 64 * 1024  # license checkout 错误出现在日志开头，只扫描该长度
+    LICENSE_RETRY_DELAY = 30.0  # license checkout 失败后重新排队前的等待（秒）
+
     def __init__(self, gconf):
         self.gconf = gconf
         self.logger = gconf.logger
         self.result_path = gconf.result_path
-        self.max_tasks = 20  # 最大并行任务数
+        self.max_tasks = gconf.parallel  # 最大并行任务数 (--parallel)
+
+        # 运行中日志监视：--sim_abort_on_fatal 或 --sim_max_errors 任一开启时生效
+        self.err_regex = re.compile(gconf.err_keyword)
+        self.exclusion_regex = re.compile(gconf.err_exclusion)
+        self.fatal_regex = re.compile(gconf.sim_fatal_keyword) if gconf.sim_abort_on_fatal else None
+        self.watch_logs = gconf.sim_abort_on_fatal or gconf.sim_max_errors > 0
+
+        # 历史运行时长，用于最长任务优先排序
+        self.runtime_db = RuntimeDB(os.path.join(gconf.base_dir, "runtime_db.json"), self.logger)
+
+        # 运行日志，用于 --resume 断点续跑
+        self.journal = RunJournal(os.path.join(self.result_path, "run_journal.jsonl"), self.logger)
+
+        # 运行结束时按报告的错误关键字规则判定日志，结果写入结果索引，报告阶段不再重新扫描日志
+        self.classifier = LogClassifier(gconf.err_keyword, gconf.err_exclusion, tail_first=gconf.log_scan == "tail")
+        self.results = ResultsIndex(self.result_path, self.logger)
+        self._signatures = {}  # (mode, tc, seed) -> 失败签名，由 run_case_async 在执行器中扫描日志得到，finish_run 取用
+
+        # 执行后端（--backend）
+        self.backend = create_backend(gconf)
+
+        # 负载/内存准入控制（--admission_control），依赖 Linux /proc，仅适用于本地后端
+        self.admission = None
+        if gconf.admission_control:
+            if not self.backend.supports_admission:
+                self.logger.warning(f"Admission control is not supported by backend '{self.backend.name}', disabled.")
+            elif os.path.exists("/proc/loadavg"):
+                self.admission = AdmissionController(gconf, self.runtime_db)
+            else:
+                self.logger.warning("/proc/loadavg not available, admission control disabled.")
+
+        # 直接执行解析后的 ncrun 配方，省去每次运行的 make 启动开销（--direct_exec 开启），仅适用于本地后端
+        self.recipes = None
+        if gconf.direct_exec and self.backend.supports_direct_exec:
+            self.recipes = RecipeCache(gconf)
+
+        # 冒烟门控（--smoke_gate）：冒烟用例先行，失败率过高时取消该模式的其余运行
+        self.smoke_gate = SmokeGate(gconf) if gconf.smoke_gate else None
+
+        # license token 池（LICENSE_POOL）：启动前获取所需特性的 token；checkout 失败的运行自动重新排队
+        self.licenses = LicensePool(gconf) if gconf.license_pool else None
+        self.license_regex = re.compile(gconf.license_err_keyword) if gconf.license_err_keyword else None
+
+    def _timeout_seconds(self, case):
+        """
+        单次运行的墙钟时间预算：优先使用用例的 TIMEOUT_LMT，否则使用 COMMON_TIMEOUT_LMT（单位：分钟）
+        :return: 秒数，未配置或为 0 时返回 None 表示不限时
+        """
+        timeout_lmt = case.get("timeout_lmt", self.gconf.common_timeout_lmt)
+        return timeout_lmt * 60 if timeout_lmt else None
+
+    async def _wait_run(self, job, watcher, timeout_sec, ticket=None):
+        """
+        等待仿真作业结束，期间检查超时与日志监视器、采样内存占用，必要时通过后端终止作业
+        :param ticket: 准入控制凭据，非 None 时周期性采样进程树 RSS
+        :return: None 表示正常结束，否则为 RUN_TIMEOUT / RUN_ABORTED
+        """
+        # 超时从作业实际开始运行时计算，批处理调度器队列中的等待时间不计入 TIMEOUT_LMT
+        await self.backend.wait_started(job)
+        if watcher is None and ticket is None:
+            if await self.backend.wait(job, timeout_sec) is None:
+                await self.backend.kill(job)
+                return RUN_TIMEOUT
+            return None
+
+        # 日志读取在线程池中进行，避免大量并发运行时阻塞事件循环；同一监视器同一时刻只有一次 scan
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + timeout_sec if timeout_sec else None
+        while job.returncode is None:
+            if ticket is not None:
+                self.admission.sample(ticket, job.pid)
+            if watcher is not None and await loop.run_in_executor(None, watcher.scan, self.WATCH_MAX_BYTES):
+                await self.backend.kill(job)
+                return RUN_ABORTED
+            if deadline is not None and time.monotonic() >= deadline:
+                if self.backend.poll(job) is not None:
+                    break  # 在两次轮询之间已经结束
+                await self.backend.kill(job)
+                return RUN_TIMEOUT
+            await self.backend.wait(job, self.WATCH_INTERVAL)
+        return None
+
+    def _license_failure(self, paths):
+        """
+        检查失败运行的日志开头是否为 license checkout 错误
+        """
+        for path in paths:
+            try:
+                with open(path, "r", errors="replace") as f:
+                    if self.license_regex.search(f.read(self.LICENSE_SCAN_BYTES)):
+                        return True
+            except OSError:
+                continue
+        return False
+
+    def _record_signature(self, mode, case, seed, signature):
+        """
+        记录失败运行的签名（归一化前的错误行）；自动波形重跑不产生结果记录，不保存
+        """
+        if not case.get("wave_rerun"):
+            self._signatures[(mode, case["tc"], seed)] = normalize_signature(signature) if signature else None
+
+    async def _first_error(self, log_file):
+        """
+        在执行器线程中查找日志的第一条错误行，避免大日志扫描阻塞事件循环
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.classifier.first_error, log_file)
+
+    def _check_results_index(self):
+        """
+        回归目录已有运行记录但没有结果索引（结果索引引入之前的回归）时，本次写入的记录不能代表全部运行：
+        不创建索引，报告回退为扫描日志，避免未重新运行的结果从报告中消失
+        """
+        has_runs = (os.path.exists(self.journal.path) and os.path.getsize(self.journal.path) > 0
+                    or os.path.exists(os.path.join(self.result_path, "final_report.json")))
+        if has_runs and not self.results.exists():
+            self.logger.warning(f"Regression has runs but no results index ({self.results.path}), "
+                                f"report will classify logs instead.")
+            self.results.enabled = False
+
+    def _mark_skipped(self, mode, tc, seed, reason):
+        """
+        被取消的运行的部分日志改名为 <log>.skipped 并注明原因，不再计入报告的通过/失败统计
+        """
+        log_dir = os.path.join(self.result_path, mode, "log")
+        for suffix in (".log", ".out"):
+            path = os.path.join(log_dir, f"{tc}_{seed}{suffix}")
+            if os.path.exists(path):
+                with open(path, "a") as f:
+                    f.write(f"\n[INFO] SKIPPED: {reason}\n")
+                os.replace(path, f"{path}.skipped")
+        self.logger.warning(f"Simulation skipped - Testcase: {tc}, Seed: {seed} ({reason})")
+
+    async def _wave_rerun(self, mode, case, run_idx, seed):
+        """
+        以 wave=on 和原种子重跑一次失败运行，供调试查看波形
+        原运行日志保持为结果日志，重跑的日志保存为 <tc>_<seed>.wave.log，不计入报告统计
+        """
+        tc = case["tc"]
+        base = os.path.join(self.result_path, mode, "log", f"{tc}_{seed}")
+        for suffix in (".log", ".out"):
+            if os.path.exists(base + suffix):
+                os.replace(base + suffix, f"{base}{suffix}.nowave")
+        self.logger.info(f"Wave rerun - Testcase: {tc}, Seed: {seed}, Mode: {mode}")
+        try:
+            await self.run_case_async(mode, dict(case, wave="on", nice=self.gconf.wave_nice, wave_rerun=True),
+                                      run_idx, seed)
+        finally:
+            for suffix in (".log", ".out"):
+                if os.path.exists(base + suffix):
+                    os.replace(base + suffix, f"{base}.wave{suffix}")
+                if os.path.exists(f"{base}{suffix}.nowave"):
+                    os.replace(f"{base}{suffix}.nowave", base + suffix)
 
     def run_case_single(self, mode, case, run_idx, seed=None):
+        """
+        Execute a single run of a test case (blocking wrapper of run_case_async)
+        :return: RUN_PASS / RUN_FAIL / RUN_TIMEOUT / RUN_ABORTED
+        """
+        return asyncio.run(self._run_queue([(mode, case, run_idx, seed)]))[0]
+
+    async def run_case_async(self, mode, case, run_idx, seed=None):
         """
         Execute a single run of a test case
+        :return: RUN_PASS / RUN_FAIL / RUN_TIMEOUT / RUN_ABORTED / RUN_LICENSE
         """
         tc = case["tc"]
         wave, ccov = case["wave"], case["ccov"]
+        if wave == "auto":
+            wave = "off"  # 自动波形：先关闭波形运行，失败后再以 wave=on 重跑
         
         # Generate seed if not provided
         if seed is None:
@@ -33,7 +244,9 @@ class SimulationManager:
         os.makedirs(log_dir, exist_ok=True)
         
         # Generate unique log file
+        # <tc>_<seed>.log 由 Makefile 自身写入，make 的标准输出单独写入 <tc>_<seed>.out，保证每个文件只有一个写者
         log_file = os.path.join(log_dir, f"{tc}_{seed}.log")
+        out_file = os.path.join(log_dir, f"{tc}_{seed}.out")
         
         # Construct make ncrun command
         cmd = [
@@ -44,24 +257,91 @@ class SimulationManager:
             f"wave={wave}",
             f"ccov={ccov}",
         ]
-        
+        build = self.gconf.build_name(ccov, wave)
+        if build:
+            cmd.append(f"build={build}")  # 与主镜像覆盖率/波形设置不同的运行（例如自动波形重跑）使用对应的额外镜像
+        cmd.extend(case.get("make_opts", []))  # 额外的 make 变量（例如 rerun 时提高打印级别）
+
+        timeout_sec = self._timeout_seconds(case)
+
+        # 优先监视 Makefile 写入的运行日志，尚未生成时监视标准输出
+        watcher = None
+        if self.watch_logs:
+            watcher = LogWatcher([log_file, out_file], self.err_regex, self.exclusion_regex,
+                                 self.fatal_regex, self.gconf.sim_max_errors)
+
         try:
             self.logger.info(f"Starting simulation for Testcase: {tc}, Seed: {seed}, Log: {log_file}")
-            process = subprocess.run(cmd, cwd=self.result_path, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-            
-            # Save run log to log_file
-            with open(log_file, "wb") as log:
-                log.write(process.stdout)
-            
-            if process.returncode != 0:
+            # 子进程标准输出直接写入文件，不经过本进程内存
+            # 本地后端以独立进程组运行，超时时可一并终止 make 及其启动的仿真器进程
+            # 等待主机负载与内存余量
+            ticket = await self.admission.acquire(mode) if self.admission else None
+            peak_rss = 0
+            start_time = time.monotonic()
+            try:
+                env = None
+                if self.recipes:
+                    cmd, env = await self.recipes.command(cmd)
+                if case.get("nice"):
+                    # 低优先级运行（例如自动波形重跑）
+                    cmd = ["nice", "-n", str(case["nice"])] + cmd
+                if env is not None:
+                    job = await self.backend.submit(cmd, self.result_path, out_file, env=env)
+                else:
+                    job = await self.backend.submit(cmd, self.result_path, out_file)
+                try:
+                    end_status = await self._wait_run(job, watcher, timeout_sec, ticket)
+                except asyncio.CancelledError:
+                    # 工具被中断（例如 Ctrl-C）时不留下孤儿仿真，--resume 会以相同种子重新运行
+                    await self.backend.kill(job)
+                    raise
+            finally:
+                if ticket is not None:
+                    peak_rss = self.admission.release(ticket)
+
+            # 只记录自然结束的运行，超时或被终止的运行时长不具代表性；自动波形重跑的时长也不计入
+            if end_status is None and not case.get("wave_rerun"):
+                self.runtime_db.record(mode, tc, case.get("sim_opts", ""), time.monotonic() - start_time, peak_rss)
+
+            # Makefile 未自行写日志时，以捕获的标准输出作为运行日志
+            if not os.path.exists(log_file):
+                os.replace(out_file, log_file)
+
+            if end_status == RUN_TIMEOUT:
+                with open(log_file, "a") as log:
+                    log.write(f"\n[ERROR] TIMEOUT: exceeded wall-clock limit of {timeout_sec:.0f}s, "
+                              f"process group killed\n")
+                self.logger.error(f"Simulation timeout ({timeout_sec:.0f}s) - Testcase: {tc}, Seed: {seed}. "
+                                  f"Check log: {log_file}")
+                self._record_signature(mode, case, seed, RUN_TIMEOUT)
+                return RUN_TIMEOUT
+            if end_status == RUN_ABORTED:
+                with open(log_file, "a") as log:
+                    log.write(f"\n[ERROR] ABORTED by log watcher: {watcher.reason}\n"
+                              f"[ERROR] SIGNATURE: {watcher.signature}\n")
+                self.logger.error(f"Simulation aborted ({watcher.reason}) - Testcase: {tc}, Seed: {seed}. "
+                                  f"Check log: {log_file}")
+                self._record_signature(mode, case, seed, watcher.signature or await self._first_error(log_file))
+                return RUN_ABORTED
+            if job.returncode != 0:
+                if self.license_regex and self._license_failure([log_file, out_file]):
+                    self.logger.error(f"License checkout failed - Testcase: {tc}, Seed: {seed}. Check log: {log_file}")
+                    self._record_signature(mode, case, seed, RUN_LICENSE)
+                    return RUN_LICENSE
                 self.logger.error(f"Simulation failed - Testcase: {tc}, Seed: {seed}. Check log: {log_file}")
-                return False
-            else:
-                self.logger.info(f"Simulation passed - Testcase: {tc}, Seed: {seed}. Log: {log_file}")
-                return True
+                self._record_signature(mode, case, seed, await self._first_error(log_file))
+                return RUN_FAIL
+            first_error = await self._first_error(log_file)
+            if first_error is not None:
+                self._record_signature(mode, case, seed, first_error)
+                self.logger.error(f"Simulation failed (errors in log) - Testcase: {tc}, Seed: {seed}. "
+                                  f"Check log: {log_file}")
+                return RUN_FAIL
+            self.logger.info(f"Simulation passed - Testcase: {tc}, Seed: {seed}. Log: {log_file}")
+            return RUN_PASS
         except Exception as e:
             self.logger.error(f"Simulation error - Testcase: {tc}, Seed: {seed}. Exception: {str(e)}")
-            return False
+            return RUN_FAIL
 
     def run_case(self, mode, case):
         """
@@ -87,16 +367,11 @@ class SimulationManager:
                 seed = int.from_bytes(os.urandom(4), "big")
             run_configs.append((run_idx, seed))
         
-        # Run in parallel using thread pool
-        with ThreadPoolExecutor(max_workers=self.max_tasks) as executor:
-            futures = [
-                executor.submit(self.run_case_single, mode, case, run_idx, seed) 
-                for run_idx, seed in run_configs
-            ]
-            results = [future.result() for future in futures]
+        # Run in parallel on the event loop
+        results = asyncio.run(self._run_queue([(mode, case, run_idx, seed) for run_idx, seed in run_configs]))
         
         # Check if any run failed
-        all_success = all(results)
+        all_success = all(result == RUN_PASS for result in results)
         if not all_success:
             self.logger.error(f"Some runs failed for Testcase: {tc}")
         else:
@@ -104,49 +379,281 @@ class SimulationManager:
         
         return all_success
 
-    def run_simulations(self):
+    def _expand_runs(self, modes):
         """
-        Execute multiple test cases with resource management
+        展开所有模式下的 (mode, tc, seed) 运行组合，构成全局运行队列
+        --shard k/N 时种子由 --random_seed 确定性派生，并只保留第 k 个分片的运行
+        :param modes: 模式列表
+        :return: [(mode, case_idx, run_idx, seed), ...]
         """
+        shard = self.gconf.shard
         case_list = self.gconf.tc_list
-        self.logger.info(f"Case list: {case_list}")
-        
-        for mode in self.gconf.mode:
-            self.logger.info(f"Starting simulations for mode: {mode}")
-            
-            # Create a flat list of all run configurations
-            all_run_configs = []
+        all_run_configs = []
+        for mode in modes:
             for case_idx, case in enumerate(case_list):
                 for run_idx in range(1, case["run_times"] + 1):
                     seed = case.get("seed", None)
                     if seed is None:
-                        seed = int.from_bytes(os.urandom(4), "big")
-                    all_run_configs.append((case_idx, run_idx, seed))
-            
-            # Run all configurations in parallel with resource constraints
-            results_by_case = [[] for _ in case_list]
-            with ThreadPoolExecutor(max_workers=self.max_tasks) as executor:
-                futures = []
-                for case_idx, run_idx, seed in all_run_configs:
-                    future = executor.submit(
-                        self.run_case_single, 
-                        mode, 
-                        case_list[case_idx], 
-                        run_idx, 
-                        seed
-                    )
-                    futures.append((future, case_idx))
-                
-                # Collect results
-                for future, case_idx in futures:
-                    result = future.result()
-                    results_by_case[case_idx].append(result)
-            
-            # Process results by case
+                        if shard:
+                            seed = shard_seed(self.gconf.random_seed, mode, case["tc"], run_idx)
+                        else:
+                            seed = int.from_bytes(os.urandom(4), "big")
+                    all_run_configs.append((mode, case_idx, run_idx, seed))
+
+        if shard:
+            total = len(all_run_configs)
+            all_run_configs = select_shard(all_run_configs, shard, self.gconf.random_seed,
+                                           key=lambda run: (run[0], case_list[run[1]]["tc"], run[2]))
+            self.logger.info(f"Shard {shard[0]}/{shard[1]}: {len(all_run_configs)} of {total} runs")
+        return all_run_configs
+
+    def rerun_failed(self, failures):
+        """
+        在同一回归目录中按原种子重新运行上一次回归失败的 (mode, tc, seed)
+        --rerun_wave 时打开波形，--rerun_opts 追加额外的 make 变量；原日志保留为 <log>.prev
+        :param failures: ReportGenerator.load_failures() 返回的失败列表
+        :return: 与 failures 顺序一致的运行状态列表
+        """
+        self._check_results_index()
+        cases = {case["tc"]: case for case in self.gconf.tc_list}
+        seeds, _ = self.journal.replay()
+        run_indexes = {(mode, tc, seed): run_idx for (mode, tc, run_idx), seed in seeds.items()}
+        make_opts = shlex.split(self.gconf.rerun_opts or "")
+
+        runs = []
+        for failure in failures:
+            mode, tc, seed = failure["mode"], failure["test_case"], int(failure["seed"])
+            case = cases.get(tc) or {"tc": tc, "wave": "off", "ccov": "on", "run_times": 1}
+            rerun_case = dict(case, make_opts=make_opts)
+            if self.gconf.rerun_wave:
+                rerun_case["wave"] = "on"
+
+            log_dir = os.path.join(self.result_path, mode, "log")
+            for suffix in (".log", ".out"):
+                path = os.path.join(log_dir, f"{tc}_{seed}{suffix}")
+                if os.path.exists(path):
+                    os.replace(path, f"{path}.prev")
+
+            # 沿用原 run_idx，使运行日志中该运行的状态被更新
+            runs.append((mode, rerun_case, run_indexes.get((mode, tc, seed), 0), seed))
+
+        self.logger.info(f"Rerunning {len(runs)} failed runs (wave: {'on' if self.gconf.rerun_wave else 'case'}, "
+                         f"extra make opts: {make_opts})")
+        results = asyncio.run(self._run_queue(runs))
+        self.runtime_db.save()
+        self.journal.close()
+        self.results.close()
+
+        passed = results.count(RUN_PASS)
+        self.logger.info(f"Rerun completed: {passed} passed, {len(results) - passed} still failing")
+        return results
+
+    def _apply_resume(self, all_run_configs):
+        """
+        按运行日志跳过已结束的运行，未结束的运行沿用原种子重新排队
+        :return: (待执行的运行列表, [(mode, case_idx, status), ...] 已结束的运行)
+        """
+        seeds, finished = self.journal.replay()
+        remaining, done = [], []
+        for mode, case_idx, run_idx, seed in all_run_configs:
+            key = (mode, self.gconf.tc_list[case_idx]["tc"], run_idx)
+            if key in finished:
+                done.append((mode, case_idx, finished[key]))
+            else:
+                remaining.append((mode, case_idx, run_idx, seeds.get(key, seed)))
+        self.logger.info(f"Resume: skipping {len(done)} finished runs, requeueing {len(remaining)} runs")
+        return remaining, done
+
+    def _order_longest_first(self, all_run_configs):
+        """
+        按历史运行时长预估值降序排列运行队列（最长任务优先），缩短回归长尾
+        """
+        estimates = {}
+        for mode, case_idx, _, _ in all_run_configs:
+            if (mode, case_idx) not in estimates:
+                case = self.gconf.tc_list[case_idx]
+                estimates[(mode, case_idx)] = self.runtime_db.estimate(mode, case["tc"], case.get("sim_opts", ""))
+        return sorted(all_run_configs, key=lambda run: estimates[(run[0], run[1])], reverse=True)
+
+    async def _run_queue(self, runs, gate=None):
+        """
+        在单个事件循环中执行运行队列，并发数由 --parallel 信号量限制
+        信号量按等待顺序放行，因此队列顺序即提交顺序
+        :param runs: [(mode, case, run_idx, seed), ...]
+        :param gate: SmokeGate 实例，非冒烟运行在占用并发槽位之前等待所属模式的门控结论
+        :return: 与 runs 顺序一致的运行状态列表
+        """
+        _use_pidfd_child_watcher()
+        semaphore = asyncio.Semaphore(self.max_tasks)
+        if gate:
+            gate.plan(runs)
+        if self.licenses:
+            self.licenses.open()
+        license_retries = self.gconf.license_retries
+
+        # 自动波形（WAVE = "auto"）：失败运行以 wave=on 按原种子低优先级重跑，并发数由 --wave_parallel 单独限制
+        wave_semaphore = asyncio.Semaphore(self.gconf.wave_parallel)
+        wave_reruns = []
+
+        # 同一用例出现 K 次相同签名的失败后取消其余种子（--cancel_after 或用例 CANCEL_AFTER）
+        signatures = {}  # (mode, tc) -> Counter(签名)
+        cancelled = {}   # (mode, tc) -> 触发取消的签名
+        running = {}     # (mode, tc) -> 运行中的 run_case_async 任务
+
+        async def run_cancellable(key, mode, case, run_idx, seed):
+            run = asyncio.ensure_future(self.run_case_async(mode, case, run_idx, seed))
+            running.setdefault(key, set()).add(run)
+            try:
+                return await run
+            except asyncio.CancelledError:
+                if key not in cancelled:
+                    raise
+                self._mark_skipped(mode, case["tc"], seed, f"repeated failure signature: {cancelled[key]}")
+                return RUN_SKIPPED
+            finally:
+                running[key].discard(run)
+
+        def finish_run(mode, case, run_idx, seed, status, duration=0.0):
+            # 写入运行日志与结果索引
+            tc = case["tc"]
+            self.journal.finish(mode, tc, run_idx, seed, status)
+            signature = None
+            if status in RUN_FAILED or status == RUN_LICENSE:
+                signature = self._signatures.pop((mode, tc, seed), None) or f"{status}: no error line"
+            log = os.path.join(mode, "log", f"{tc}_{seed}.log") if status != RUN_SKIPPED else None
+            self.results.append(mode, tc, seed, run_idx, status, duration, signature, log)
+            return signature
+
+        def record_failure(key, case, status, signature):
+            cancel_after = case.get("cancel_after", self.gconf.cancel_after)
+            if not cancel_after or status not in RUN_FAILED or key in cancelled:
+                return
+            counter = signatures.setdefault(key, Counter())
+            counter[signature] += 1
+            if counter[signature] >= cancel_after:
+                cancelled[key] = signature
+                self.logger.warning(f"Cancelling remaining seeds of Testcase: {key[1]} (mode: {key[0]}) after "
+                                    f"{cancel_after} failures with signature: {signature}")
+                for run in running.get(key, ()):
+                    run.cancel()
+
+        async def wave_rerun(mode, case, run_idx, seed):
+            features = self.licenses.features(dict(case, wave="on")) if self.licenses else []
+            async with wave_semaphore:
+                if features:
+                    await self.licenses.acquire(features)
+                try:
+                    await self._wave_rerun(mode, case, run_idx, seed)
+                finally:
+                    if features:
+                        await self.licenses.release(features)
+
+        async def run_bounded(mode, case, run_idx, seed):
+            key = (mode, case["tc"])
+            if gate and not await gate.admit(mode, case):
+                finish_run(mode, case, run_idx, seed, RUN_SKIPPED)
+                return RUN_SKIPPED
+            features = self.licenses.features(case) if self.licenses else []
+            duration = 0.0
+            for retry in range(license_retries + 1):
+                if retry:
+                    # license checkout 失败不计为用例失败：释放并发槽位，稍后以相同种子重新排队
+                    self.logger.warning(f"Requeueing Testcase: {case['tc']}, Seed: {seed} after license checkout "
+                                        f"failure ({retry}/{license_retries})")
+                    await asyncio.sleep(self.LICENSE_RETRY_DELAY)
+                # 先获取 license token 再占用并发槽位：等待稀缺特性（例如覆盖率）的运行不占槽位，不阻塞无需该特性的运行
+                if features:
+                    await self.licenses.acquire(features)
+                try:
+                    async with semaphore:
+                        if key in cancelled:
+                            status = RUN_SKIPPED
+                            break
+                        self.journal.start(mode, case["tc"], run_idx, seed)
+                        start_time = time.monotonic()
+                        status = await run_cancellable(key, mode, case, run_idx, seed)
+                        duration = time.monotonic() - start_time
+                finally:
+                    if features:
+                        await self.licenses.release(features)
+                if status != RUN_LICENSE:
+                    break
+            signature = finish_run(mode, case, run_idx, seed, status, duration)
+            record_failure(key, case, status, signature)
+            if case["wave"] == "auto" and status in RUN_FAILED:
+                wave_reruns.append(asyncio.ensure_future(wave_rerun(mode, case, run_idx, seed)))
+            if gate and gate.is_smoke(case):
+                gate.record(mode, status == RUN_PASS)
+            return status
+
+        await self.backend.open()
+        try:
+            results = await asyncio.gather(*(run_bounded(*run) for run in runs))
+            await asyncio.gather(*wave_reruns)
+            return results
+        finally:
+            for rerun in wave_reruns:
+                rerun.cancel()
+            await self.backend.close()
+
+    def run_simulations(self, modes=None):
+        """
+        Execute all (mode, tc, seed) runs from one global queue bounded by --parallel
+        :param modes: 需要仿真的模式列表，默认使用 gconf.mode
+        """
+        case_list = self.gconf.tc_list
+        modes = self.gconf.mode if modes is None else modes
+        self.logger.info(f"Case list: {case_list}")
+        self._check_results_index()
+
+        # 所有模式的运行统一进入一个队列，避免某个模式的长尾阻塞下一个模式
+        all_run_configs = self._expand_runs(modes)
+        finished_runs = []
+        if self.gconf.resume:
+            all_run_configs, finished_runs = self._apply_resume(all_run_configs)
+        all_run_configs = self._order_longest_first(all_run_configs)
+        self.journal.plan([(mode, case_list[case_idx]["tc"], run_idx, seed)
+                           for mode, case_idx, run_idx, seed in all_run_configs])
+        self.logger.info(
+            f"Submitting {len(all_run_configs)} runs across {len(modes)} modes, parallel limit: {self.max_tasks}"
+        )
+
+        if self.smoke_gate:
+            all_run_configs = sorted(all_run_configs, key=lambda run: not self.smoke_gate.is_smoke(case_list[run[1]]))
+        results = asyncio.run(self._run_queue(
+            [(mode, case_list[case_idx], run_idx, seed) for mode, case_idx, run_idx, seed in all_run_configs],
+            self.smoke_gate
+        ))
+        if self.smoke_gate:
+            self.smoke_gate.save()
+
+        results_by_case = {}  # (mode, case_idx) -> [RUN_PASS / RUN_FAIL / ... / RUN_LICENSE, ...]
+        for mode, case_idx, status in finished_runs:
+            results_by_case.setdefault((mode, case_idx), []).append(status)
+        for (mode, case_idx, _, _), result in zip(all_run_configs, results):
+            results_by_case.setdefault((mode, case_idx), []).append(result)
+
+        # Process results by mode and case
+        for mode in modes:
             failed_cases = []
-            for case_idx, case_results in enumerate(results_by_case):
-                if not all(case_results):
-                    failed_cases.append(case_list[case_idx])
-                    self.logger.error(f"Case failed: {case_list[case_idx]['tc']}")
-            
-            self.logger.info(f"Simulation completed for mode: {mode}. Failed cases: {len(failed_cases)}")
\ No newline at end of file
+            timeout_runs = 0
+            aborted_runs = 0
+            skipped_runs = 0
+            license_runs = 0
+            for case_idx, case in enumerate(case_list):
+                case_results = results_by_case.get((mode, case_idx), [])
+                timeout_runs += case_results.count(RUN_TIMEOUT)
+                aborted_runs += case_results.count(RUN_ABORTED)
+                skipped_runs += case_results.count(RUN_SKIPPED)
+                license_runs += case_results.count(RUN_LICENSE)
+                if any(result not in (RUN_PASS, RUN_SKIPPED) for result in case_results):
+                    failed_cases.append(case)
+                    self.logger.error(f"Case failed: {case['tc']} (mode: {mode})")
+
+            self.logger.info(f"Simulation completed for mode: {mode}. Failed cases: {len(failed_cases)}, "
+                             f"timeout runs: {timeout_runs}, aborted runs: {aborted_runs}, "
+                             f"skipped runs: {skipped_runs}, license failures: {license_runs}")
+
+        self.runtime_db.save()
+        self.journal.close()
+        self.results.close()
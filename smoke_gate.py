@@ -0,0 +1,100 @@
+import os
+import json
+import asyncio
+
+
+class SmokeGate:
+    """
+    冒烟门控：TAGS 含 SMOKE_TAGS 的用例在各模式中先行运行，
+    某模式的冒烟运行全部结束后失败率超过 SMOKE_FAIL_RATE 时，取消该模式的其余运行
+    """
+
+    def __init__(self, gconf):
+        self.logger = gconf.logger
+        self.smoke_tags = set(gconf.smoke_tags)
+        self.fail_rate = gconf.smoke_fail_rate
+        self.path = os.path.join(gconf.result_path, "smoke_gate.json")
+        self._pending = {}  # mode -> 尚未结束的冒烟运行数
+        self._failures = {}  # mode -> 冒烟运行失败数
+        self._totals = {}  # mode -> 冒烟运行总数
+        self._skipped = {}  # mode -> 被取消的运行数
+        self._decisions = {}  # mode -> asyncio.Event，置位表示门控结论已出
+        self._gated = set()
+
+    def is_smoke(self, case):
+        """
+        用例是否属于冒烟集合，TAGS 可以是字符串或列表
+        """
+        tags = case.get("tags", [])
+        if isinstance(tags, str):
+            tags = [tags]
+        return bool(self.smoke_tags.intersection(tags))
+
+    def plan(self, runs):
+        """
+        统计各模式的冒烟运行数，须在事件循环内调用
+        没有冒烟运行的模式不设门控
+        """
+        modes = {run[0] for run in runs}
+        for mode in modes:
+            self._decisions[mode] = asyncio.Event()
+            self._pending[mode] = self._failures[mode] = self._totals[mode] = self._skipped[mode] = 0
+        for mode, case, _, _ in runs:
+            if self.is_smoke(case):
+                self._pending[mode] += 1
+                self._totals[mode] += 1
+        for mode in modes:
+            if not self._pending[mode]:
+                self.logger.warning(f"No smoke tests ({', '.join(sorted(self.smoke_tags))}) for mode: {mode}, "
+                                    f"smoke gate disabled for this mode.")
+                self._decisions[mode].set()
+
+    def record(self, mode, passed):
+        """
+        记录一次冒烟运行的结果，该模式的冒烟运行全部结束时给出门控结论
+        """
+        self._pending[mode] -= 1
+        if not passed:
+            self._failures[mode] += 1
+        if self._pending[mode]:
+            return
+
+        rate = self._failures[mode] / self._totals[mode]
+        if rate > self.fail_rate:
+            self._gated.add(mode)
+            self.logger.error(f"Smoke gate closed for mode: {mode} ({self._failures[mode]}/{self._totals[mode]} "
+                              f"smoke runs failed, threshold {self.fail_rate:.0%}), cancelling remaining runs.")
+        else:
+            self.logger.info(f"Smoke gate passed for mode: {mode} "
+                             f"({self._failures[mode]}/{self._totals[mode]} smoke runs failed)")
+        self._decisions[mode].set()
+
+    async def admit(self, mode, case):
+        """
+        等待该模式的门控结论
+        :return: 冒烟运行总是放行；其余运行在门控关闭时返回 False
+        """
+        if self.is_smoke(case):
+            return True
+        await self._decisions[mode].wait()
+        if mode in self._gated:
+            self._skipped[mode] += 1
+            return False
+        return True
+
+    def save(self):
+        """
+        写出各模式的门控结果，供报告使用
+        """
+        summary = {
+            mode: {
+                "smoke_runs": self._totals[mode],
+                "smoke_failures": self._failures[mode],
+                "threshold": self.fail_rate,
+                "gated": mode in self._gated,
+                "skipped_runs": self._skipped[mode],
+            }
+            for mode in self._decisions if self._totals[mode]
+        }
+        with open(self.path, "w") as f:
+            json.dump(summary, f, indent=4)
@@ -0,0 +1,81 @@
+"""
+BuildCache 测试：恢复的 exec 目录与缓存互不影响，缓存总大小超过上限时按最近使用时间淘汰
+"""
+import os
+import sys
+import time
+import shutil
+import logging
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from build_cache import BuildCache  # noqa: E402
+
+
+class TestBuildCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="regr_build_cache_")
+        self.gconf = SimpleNamespace(logger=logging.getLogger("test_build_cache"), base_dir=self.tmp_dir,
+                                     result_path=self.tmp_dir, src_dirs=[], build_cache_max_gb=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def make_exec(self, name, size=0):
+        exec_dir = os.path.join(self.tmp_dir, name, "exec")
+        os.makedirs(os.path.join(exec_dir, "simv.vdb"))
+        with open(os.path.join(exec_dir, "simv"), "wb") as f:
+            f.write(b"simv\n" + b"\0" * size)
+        with open(os.path.join(exec_dir, "simv.vdb", "db"), "w") as f:
+            f.write("cached\n")
+        return exec_dir
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_restored_files_are_independent_of_cache(self):
+        cache = BuildCache(self.gconf)
+        cache.store("k1", self.make_exec("build"))
+
+        restored = os.path.join(self.tmp_dir, "run", "exec")
+        self.assertTrue(cache.restore("k1", restored))
+        # 仿真阶段原地修改 exec 中的文件
+        with open(os.path.join(restored, "simv.vdb", "db"), "w") as f:
+            f.write("modified\n")
+
+        self.assertEqual(self.read(os.path.join(cache.cache_dir, "k1", "exec", "simv.vdb", "db")), "cached\n")
+        self.assertTrue(cache.restore("k1", restored))
+        self.assertEqual(self.read(os.path.join(restored, "simv.vdb", "db")), "cached\n")
+
+    def test_miss(self):
+        self.assertFalse(BuildCache(self.gconf).restore("missing", os.path.join(self.tmp_dir, "exec")))
+
+    def test_evicts_least_recently_used(self):
+        self.gconf.build_cache_max_gb = 2.5 * 1024 / 1024 ** 3  # 约 2.5 KB，容纳两个缓存项
+        cache = BuildCache(self.gconf)
+        for key in ("k1", "k2"):
+            cache.store(key, self.make_exec(f"build_{key}", 1024))
+            time.sleep(0.05)
+
+        # 最近使用过 k1，写入 k3 时应淘汰 k2
+        self.assertTrue(cache.restore("k1", os.path.join(self.tmp_dir, "run", "exec")))
+        time.sleep(0.05)
+        cache.store("k3", self.make_exec("build_k3", 1024))
+
+        self.assertEqual(sorted(os.listdir(cache.cache_dir)), ["k1", "k3"])
+
+    def test_unlimited_size_never_evicts(self):
+        cache = BuildCache(self.gconf)
+        for key in ("k1", "k2", "k3"):
+            cache.store(key, self.make_exec(f"build_{key}", 1024))
+        self.assertEqual(sorted(os.listdir(cache.cache_dir)), ["k1", "k2", "k3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+--backend fake 批处理流程测试：在临时 socket 上启动 fake_scheduler.py 守护进程，验证数组合并提交、返回码、终止与超时
+"""
+import os
+import sys
+import time
+import shutil
+import asyncio
+import logging
+import tempfile
+import unittest
+import subprocess
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sim_backend import FakeBackend  # noqa: E402
+from simulation import SimulationManager, RUN_TIMEOUT  # noqa: E402
+
+
+class FakeSchedulerTestCase(unittest.IsolatedAsyncioTestCase):
+    """
+    每个测试启动独立的模拟调度器守护进程
+    """
+
+    SLOTS = 8
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="regr_fake_")
+        self.socket_path = os.path.join(self.tmp_dir, "scheduler.sock")
+        self.daemon = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "fake_scheduler.py"), "daemon",
+             "--socket", self.socket_path, "--slots", str(self.SLOTS)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 10
+        while not os.path.exists(self.socket_path):
+            if self.daemon.poll() is not None or time.monotonic() > deadline:
+                self.fail("fake scheduler daemon did not start")
+            time.sleep(0.05)
+        self.gconf = SimpleNamespace(logger=logging.getLogger("test_fake_backend"), result_path=self.tmp_dir,
+                                     bsb_opts="Local Machine", fake_scheduler_socket=self.socket_path)
+
+    def tearDown(self):
+        self.daemon.kill()
+        self.daemon.wait()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    async def asyncSetUp(self):
+        self.backend = FakeBackend(self.gconf)
+        self.backend.BATCH_WINDOW = 0.2
+        self.backend.POLL_INTERVAL = 0.2
+        await self.backend.open()
+
+    async def asyncTearDown(self):
+        await self.backend.close()
+
+    async def submit(self, name, script):
+        out_file = os.path.join(self.tmp_dir, f"{name}.out")
+        return await self.backend.submit(["/bin/sh", "-c", script], self.tmp_dir, out_file)
+
+
+class TestFakeBackend(FakeSchedulerTestCase):
+
+    async def test_submits_grouped_into_one_array(self):
+        jobs = [await self.submit(f"run_{i}", f"echo run {i}") for i in range(3)]
+        results = await asyncio.gather(*(self.backend.wait(job, 30) for job in jobs))
+
+        self.assertEqual(results, [0, 0, 0])
+        self.assertEqual(len({job.job_id for job in jobs}), 1)
+        self.assertEqual([job.index for job in jobs], [1, 2, 3])
+        self.assertEqual(len(os.listdir(os.path.join(self.tmp_dir, "batch"))), 1)
+        for i in range(3):
+            with open(os.path.join(self.tmp_dir, f"run_{i}.out")) as f:
+                self.assertEqual(f.read().strip(), f"run {i}")
+
+    async def test_return_codes(self):
+        passed = await self.submit("pass", "exit 0")
+        failed = await self.submit("fail", "echo boom; exit 3")
+
+        self.assertEqual(await self.backend.wait(passed, 30), 0)
+        self.assertEqual(await self.backend.wait(failed, 30), 3)
+
+    async def test_kill_on_timeout(self):
+        job = await self.submit("hang", "echo started; sleep 30")
+        await self.backend.wait_started(job)
+
+        self.assertIsNone(await self.backend.wait(job, 0.5))
+        await self.backend.kill(job)
+        self.assertEqual(job.returncode, -9)
+        self.assertFalse(os.path.exists(job.rc_file))
+
+    async def test_rc_rechecked_before_timeout(self):
+        # 作业在两次轮询之间结束时，超时前的复查应返回其返回码而不是判定超时
+        self.backend.POLL_INTERVAL = 60
+        job = await self.submit("quick", "exit 0")
+        await asyncio.sleep(self.backend.BATCH_WINDOW + 1.0)
+
+        self.assertEqual(await self.backend.wait(job, 0.1), 0)
+
+
+class TestFakeBackendQueueTime(FakeSchedulerTestCase):
+    """
+    单个调度槽位：排队等待的时间不计入运行超时
+    """
+
+    SLOTS = 1
+
+    def manager(self):
+        manager = SimulationManager.__new__(SimulationManager)
+        manager.backend = self.backend
+        manager.admission = None
+        return manager
+
+    async def test_pending_time_not_counted(self):
+        jobs = [await self.submit(f"slow_{i}", "sleep 1; echo done") for i in range(3)]
+        manager = self.manager()
+
+        start = time.monotonic()
+        results = await asyncio.gather(*(manager._wait_run(job, None, 1.8) for job in jobs))
+
+        self.assertGreater(time.monotonic() - start, 1.8)
+        self.assertEqual(results, [None, None, None])
+        self.assertEqual([job.returncode for job in jobs], [0, 0, 0])
+
+    async def test_running_time_still_limited(self):
+        first = await self.submit("long", "sleep 30")
+        second = await self.submit("queued", "exit 0")
+        manager = self.manager()
+
+        self.assertEqual(await manager._wait_run(first, None, 1.0), RUN_TIMEOUT)
+        self.assertIsNone(await manager._wait_run(second, None, 5.0))
+        self.assertEqual(second.returncode, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
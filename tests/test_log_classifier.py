@@ -0,0 +1,110 @@
+"""
+LogClassifier 测试：判定结果与第一条错误行与 grep -vE '<排除模式>' <log> | grep -E '<错误关键字>' 管道一致，
+ere_to_python 转换后的正则与 grep -E 匹配相同的行
+"""
+import os
+import re
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from log_classifier import LogClassifier, ere_to_python  # noqa: E402
+
+ERR_KEYWORD = "Failed|Error|FAILED|ERROR"
+ERR_EXCLUSION = r"NO UVM_ERROR|UVM_ERROR\s+:\s+0"
+
+SUMMARY_PASS = ("--- UVM Report Summary ---\n"
+                "UVM_INFO :   12\nUVM_WARNING :    0\nUVM_ERROR :    0\nUVM_FATAL :    0\n")
+
+LOGS = {
+    "empty": "",
+    "clean": "UVM_INFO tb.sv(10) @ 0: reporter [RNTST] Running test\n" + SUMMARY_PASS,
+    "uvm_error": ("UVM_INFO start\nUVM_ERROR scb.sv(44) @ 5123ns: [SCB] mismatch\n"
+                  "--- UVM Report Summary ---\nUVM_ERROR :    1\nUVM_FATAL :    0\n"),
+    # 汇总计数为零，但存在仿真器自身的错误
+    "zero_summary_tool_error": "ncsim: *E,ASRTST: Assertion Error at 10 NS\n" + SUMMARY_PASS,
+    "excluded_only": "NO UVM_ERROR found\nUVM_ERROR :    0\n",
+    # 同一行同时匹配排除模式与错误关键字时整行被排除
+    "excluded_line_with_keyword": "NO UVM_ERROR but Failed\nUVM_INFO done\n",
+    # 排除模式中的 \s 不能跨行匹配
+    "split_summary": "UVM_ERROR\n:    0\n",
+    "no_trailing_newline": "UVM_INFO start\nTest Failed",
+    "crlf": "UVM_INFO start\r\nERROR: crlf line\r\n",
+    "second_match_after_excluded": "UVM_ERROR :    0\nUVM_ERROR :    0\nFAILED at end\n",
+}
+
+# (ERE 模式, 样例行)：覆盖 POSIX 字符类与 \< \> 词边界
+ERE_PATTERNS = [
+    r"[[:digit:]]+ errors?",
+    r"\<ERROR\>",
+    r"[[:upper:]]+_FATAL",
+    r"[^[:space:]]+:ERR",
+    r"err[[:punct:]]",
+    r"0x[[:xdigit:]]{4}\>",
+    r"^[[:blank:]]+Error",
+]
+ERE_LINES = [
+    "3 errors found", "no errors", "ERROR: x", "ERRORS: y", "XERROR z", "UVM_FATAL a", "uvm_fatal b",
+    "tb:ERR c", " :ERR d", "err! e", "err f", "0xbeef g", "0xbeefcafe h", "  Error i", "Error j",
+    "\tError k",
+]
+
+
+class TestLogClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="regr_classifier_")
+        self.env = dict(os.environ, LC_ALL="C")
+        self.paths = {}
+        for name, content in LOGS.items():
+            path = os.path.join(self.tmp_dir, f"{name}.log")
+            with open(path, "w", newline="") as f:
+                f.write(content)
+            self.paths[name] = path
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def grep_first_error(self, path):
+        result = subprocess.run(["/bin/sh", "-c", 'grep -vE "$1" "$3" | grep -E "$2"', "sh",
+                                 ERR_EXCLUSION, ERR_KEYWORD, path],
+                                stdout=subprocess.PIPE, env=self.env)
+        lines = result.stdout.decode().splitlines()
+        return lines[0].strip() if lines else None
+
+    def test_matches_grep_pipeline(self):
+        for tail_first in (False, True):
+            classifier = LogClassifier(ERR_KEYWORD, ERR_EXCLUSION, tail_first=tail_first)
+            for name, path in self.paths.items():
+                with self.subTest(log=name, tail_first=tail_first):
+                    self.assertEqual(classifier.first_error(path), self.grep_first_error(path))
+
+    def test_classify_with_process_pool(self):
+        classifier = LogClassifier(ERR_KEYWORD, ERR_EXCLUSION, tail_first=True)
+        classifier.POOL_THRESHOLD = 1
+        expected = {path: self.grep_first_error(path) for path in self.paths.values()}
+        self.assertEqual(classifier.classify(self.paths.values(), workers=2), expected)
+
+    def test_missing_log_has_no_error(self):
+        classifier = LogClassifier(ERR_KEYWORD, ERR_EXCLUSION)
+        self.assertFalse(classifier.has_error(os.path.join(self.tmp_dir, "missing.log")))
+
+    def test_ere_to_python_matches_grep(self):
+        lines_file = os.path.join(self.tmp_dir, "lines.txt")
+        with open(lines_file, "w") as f:
+            f.write("\n".join(ERE_LINES) + "\n")
+        for pattern in ERE_PATTERNS:
+            with self.subTest(pattern=pattern):
+                result = subprocess.run(["grep", "-nE", pattern, lines_file], stdout=subprocess.PIPE, env=self.env)
+                expected = [int(line.split(":", 1)[0]) - 1 for line in result.stdout.decode().splitlines()]
+                regex = re.compile(ere_to_python(pattern))
+                self.assertEqual([i for i, line in enumerate(ERE_LINES) if regex.search(line)], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
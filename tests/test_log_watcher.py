@@ -0,0 +1,89 @@
+"""
+LogWatcher 测试：增量扫描、错误计数阈值，以及标准输出文件切换到 Makefile 日志时计数保留且重复错误行不重复计数
+"""
+import os
+import re
+import sys
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from log_watcher import LogWatcher  # noqa: E402
+
+ERR_REGEX = re.compile(r"UVM_ERROR|Error")
+EXCLUSION_REGEX = re.compile(r"UVM_ERROR\s+:\s+0")
+FATAL_REGEX = re.compile(r"UVM_FATAL\s+[^:\s]")
+
+
+class TestLogWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="regr_watcher_")
+        self.log_file = os.path.join(self.tmp_dir, "tc_1.log")
+        self.out_file = os.path.join(self.tmp_dir, "tc_1.out")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def watcher(self, max_errors=0):
+        return LogWatcher([self.log_file, self.out_file], ERR_REGEX, EXCLUSION_REGEX, FATAL_REGEX, max_errors)
+
+    def append(self, path, text):
+        with open(path, "a") as f:
+            f.write(text)
+
+    def test_incremental_scan_and_partial_line(self):
+        watcher = self.watcher()
+        self.append(self.out_file, "UVM_INFO start\nUVM_ERROR a.sv(1) @ 10ns: [A] first\nUVM_ERR")
+        self.assertFalse(watcher.scan())
+        self.assertEqual(watcher.error_count, 1)
+
+        self.append(self.out_file, "OR b.sv(2) @ 20ns: [B] second\nUVM_ERROR :    0\n")
+        self.assertFalse(watcher.scan())
+        self.assertEqual(watcher.error_count, 2)
+        self.assertEqual(watcher.signature, "UVM_ERROR a.sv(1) @ 10ns: [A] first")
+
+    def test_fatal_triggers(self):
+        watcher = self.watcher()
+        self.append(self.out_file, "UVM_FATAL c.sv(3) @ 30ns: [C] dead\n")
+        self.assertTrue(watcher.scan())
+        self.assertIn("fatal pattern", watcher.reason)
+
+    def test_switch_keeps_count_and_deduplicates_repeated_lines(self):
+        watcher = self.watcher(max_errors=3)
+        self.append(self.out_file, "UVM_ERROR a.sv(1) @ 10ns: [A] first\nUVM_ERROR a.sv(2) @ 20ns: [A] second\n")
+        self.assertFalse(watcher.scan())
+        self.assertEqual(watcher.error_count, 2)
+
+        # Makefile 日志晚于标准输出出现，重复包含已计数的两条错误，另有标准输出中没有的内容
+        self.append(self.log_file, "make[1]: entering\nUVM_ERROR a.sv(1) @ 10ns: [A] first\n"
+                                   "UVM_ERROR a.sv(2) @ 20ns: [A] second\n")
+        self.assertFalse(watcher.scan())
+        self.assertEqual(watcher.error_count, 2)
+        self.assertEqual(watcher.signature, "UVM_ERROR a.sv(1) @ 10ns: [A] first")
+
+        self.append(self.log_file, "UVM_ERROR a.sv(3) @ 30ns: [A] third\n")
+        self.assertTrue(watcher.scan())
+        self.assertEqual(watcher.error_count, 3)
+
+    def test_switch_keeps_errors_only_in_stdout(self):
+        # 只出现在标准输出中的错误（例如 Makefile 日志不包含的工具输出）在切换后仍然计数
+        watcher = self.watcher(max_errors=2)
+        self.append(self.out_file, "Error: license server slow\n")
+        self.assertFalse(watcher.scan())
+
+        self.append(self.log_file, "UVM_INFO start\n")
+        self.assertFalse(watcher.scan())
+        self.assertEqual(watcher.error_count, 1)
+
+        self.append(self.log_file, "UVM_ERROR d.sv(4) @ 40ns: [D] mismatch\n")
+        self.assertTrue(watcher.scan())
+        self.assertEqual(watcher.error_count, 2)
+        self.assertEqual(watcher.signature, "Error: license server slow")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+RecipeCache 测试：仓库 Makefile 的 ncrun 配方直接执行与 make ncrun 结果一致，make 专属语义回退为 make
+"""
+import os
+import sys
+import shutil
+import asyncio
+import logging
+import tempfile
+import unittest
+import subprocess
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from recipe_cache import RecipeCache  # noqa: E402
+
+
+class TestRecipeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="regr_recipe_")
+        self.gconf = SimpleNamespace(logger=logging.getLogger("test_recipe_cache"), result_path=self.tmp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def write_makefile(self, content):
+        with open(os.path.join(self.tmp_dir, "Makefile"), "w") as f:
+            f.write(content)
+
+    def resolve(self, cmd):
+        return asyncio.run(RecipeCache(self.gconf).command(cmd))
+
+    def run_cmd(self, cmd, env=None):
+        result = subprocess.run(cmd, cwd=self.tmp_dir, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        return result.returncode, result.stdout.decode()
+
+    def read(self, path):
+        with open(os.path.join(self.tmp_dir, path)) as f:
+            return f.read()
+
+    def test_repo_makefile_matches_make(self):
+        shutil.copy(os.path.join(ROOT, "Makefile"), self.tmp_dir)
+        make_vars = ["mode=m", "wave=on", "ccov=off", "build=nocov"]
+        cmd, env = self.resolve(["make", "ncrun", *make_vars, "tc=tc_a", "seed=1000000007"])
+        self.assertIsNotNone(env, "repo Makefile should be executed directly")
+
+        # 直接执行的脚本即 make -n 输出的各条配方行
+        _, dry_run = self.run_cmd(["make", "--no-print-directory", "-n", "ncrun", *make_vars,
+                                   "tc=tc_a", "seed=1000000007"])
+        self.assertEqual(cmd[2], RecipeCache._build_script(dry_run))
+
+        direct_rc, direct_out = self.run_cmd(cmd, env)
+        direct_log = self.read("m/log/tc_a_1000000007.log")
+        make_rc, make_out = self.run_cmd(["make", "--no-print-directory", "ncrun", *make_vars,
+                                          "tc=tc_a", "seed=1000000007"])
+        make_log = self.read("m/log/tc_a_1000000007.log")
+
+        # 配方以 $RANDOM 决定通过与否，只比较确定的部分，并检查两种方式各自的返回码与日志一致
+        header = 4
+        self.assertEqual(direct_log.splitlines()[:header + 1], make_log.splitlines()[:header + 1])
+        self.assertEqual(direct_out.splitlines()[0], make_out.splitlines()[0])
+        for rc, out, log in ((direct_rc, direct_out, direct_log), (make_rc, make_out, make_log)):
+            self.assertEqual(rc == 0, "Simulation completed successfully" in log)
+            self.assertEqual(rc == 0, "[INFO] Simulation successful" in out)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir, "m/wave/tc_a_1000000007.fsdb")))
+
+    def test_seed_substitution_does_not_touch_other_literals(self):
+        self.write_makefile("ncrun:\n\t@echo seed=$(seed) limit=1000000007\n")
+        cmd, env = self.resolve(["make", "ncrun", "tc=t", "seed=42"])
+        self.assertIsNotNone(env)
+        self.assertEqual(self.run_cmd(cmd, env), (0, "seed=42 limit=1000000007\n"))
+
+    def test_fallback_on_ignored_errors(self):
+        self.write_makefile("ncrun:\n\t@echo start $(tc)\n\t-@false\n\t@echo end $(seed)\n")
+        cmd = ["make", "ncrun", "tc=t", "seed=1"]
+        self.assertEqual(self.resolve(cmd), (cmd, None))
+
+    def test_fallback_on_target_specific_export(self):
+        self.write_makefile("ncrun: export FOO=target_specific\nncrun:\n\t@echo FOO=$$FOO $(tc) $(seed)\n")
+        cmd = ["make", "ncrun", "tc=t", "seed=1"]
+        self.assertEqual(self.resolve(cmd), (cmd, None))
+
+    def test_fallback_on_oneshell_and_shellflags(self):
+        for header in (".ONESHELL:\n", ".SHELLFLAGS = -ec\n"):
+            self.write_makefile(f"{header}ncrun:\n\t@echo $(tc) $(seed)\n")
+            cmd = ["make", "ncrun", "tc=t", "seed=1"]
+            self.assertEqual(self.resolve(cmd), (cmd, None), header)
+
+    def test_continuation_line_starting_with_dash_is_not_ignore_errors(self):
+        self.write_makefile("ncrun:\n\t@echo $(tc) \\\n\t-n $(seed)\n")
+        cmd, env = self.resolve(["make", "ncrun", "tc=t", "seed=7"])
+        self.assertIsNotNone(env)
+        self.assertEqual(self.run_cmd(cmd, env), (0, "t -n 7\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
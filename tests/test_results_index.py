@@ -0,0 +1,67 @@
+"""
+ResultsIndex 测试：追加到已有索引的进程写入的记录带 rerun 字段，iter_records 只对这些运行去重并以最后一条为准
+"""
+import os
+import sys
+import shutil
+import logging
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from results_index import ResultsIndex  # noqa: E402
+
+
+class TestResultsIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="regr_results_index_")
+        self.logger = logging.getLogger("test_results_index")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def write(self, runs):
+        index = ResultsIndex(self.tmp_dir, self.logger)
+        for mode, tc, seed, status in runs:
+            index.append(mode, tc, seed, 0, status, 1.0, None, f"{mode}/log/{tc}_{seed}.log")
+        index.close()
+
+    def records(self):
+        index = ResultsIndex(self.tmp_dir, self.logger)
+        return [(r["mode"], r["tc"], r["seed"], r["status"]) for r in index.iter_records()]
+
+    def test_first_pass_keeps_every_record(self):
+        # 同一次回归中重复的 (mode, tc, seed)（例如相同种子的多次运行）都保留
+        runs = [("m", "tc_a", 1, "PASS"), ("m", "tc_a", 1, "FAIL"), ("m", "tc_b", 2, "PASS")]
+        self.write(runs)
+        self.assertEqual(self.records(), runs)
+
+    def test_rerun_replaces_original_records(self):
+        self.write([("m", "tc_a", 1, "FAIL"), ("m", "tc_b", 2, "PASS"), ("k", "tc_a", 1, "FAIL")])
+        self.write([("m", "tc_a", 1, "FAIL")])
+        self.write([("m", "tc_a", 1, "PASS"), ("k", "tc_a", 1, "PASS")])
+
+        with open(os.path.join(self.tmp_dir, ResultsIndex.FILE_NAME)) as f:
+            self.assertEqual(sum('"rerun": true' in line for line in f), 3)
+        self.assertEqual(self.records(), [("m", "tc_b", 2, "PASS"), ("m", "tc_a", 1, "PASS"),
+                                          ("k", "tc_a", 1, "PASS")])
+
+    def test_truncated_line_is_skipped(self):
+        self.write([("m", "tc_a", 1, "PASS")])
+        with open(os.path.join(self.tmp_dir, ResultsIndex.FILE_NAME), "a") as f:
+            f.write('{"mode": "m", "tc": "tc_b", "se')
+        self.assertEqual(self.records(), [("m", "tc_a", 1, "PASS")])
+
+    def test_disabled_index_writes_nothing(self):
+        index = ResultsIndex(self.tmp_dir, self.logger)
+        index.enabled = False
+        index.append("m", "tc_a", 1, 0, "PASS", 1.0, None, "m/log/tc_a_1.log")
+        index.close()
+        self.assertFalse(index.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
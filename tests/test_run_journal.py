@@ -0,0 +1,77 @@
+"""
+RunJournal 测试：回放得到每个运行的种子与结束状态，重新开始的运行不再视为已结束，崩溃留下的半行被忽略
+"""
+import os
+import sys
+import shutil
+import logging
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from run_journal import RunJournal  # noqa: E402
+
+
+class TestRunJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="regr_journal_")
+        self.path = os.path.join(self.tmp_dir, "run_journal.jsonl")
+        self.logger = logging.getLogger("test_run_journal")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def journal(self):
+        return RunJournal(self.path, self.logger)
+
+    def test_missing_journal(self):
+        self.assertEqual(self.journal().replay(), ({}, {}))
+
+    def test_replay(self):
+        journal = self.journal()
+        journal.plan([("m", "tc_a", 0, 11), ("m", "tc_a", 1, 12), ("k", "tc_b", 0, 21)])
+        journal.start("m", "tc_a", 0, 11)
+        journal.finish("m", "tc_a", 0, 11, "PASS")
+        journal.start("m", "tc_a", 1, 12)
+        journal.close()
+
+        seeds, finished = self.journal().replay()
+        self.assertEqual(seeds, {("m", "tc_a", 0): 11, ("m", "tc_a", 1): 12, ("k", "tc_b", 0): 21})
+        self.assertEqual(finished, {("m", "tc_a", 0): "PASS"})
+
+    def test_restarted_run_is_unfinished_until_it_finishes_again(self):
+        journal = self.journal()
+        journal.plan([("m", "tc_a", 0, 11)])
+        journal.start("m", "tc_a", 0, 11)
+        journal.finish("m", "tc_a", 0, 11, "FAIL")
+        # --rerun_failed / --resume 重新开始同一运行
+        journal.start("m", "tc_a", 0, 11)
+        self.assertEqual(journal.replay()[1], {})
+
+        journal.finish("m", "tc_a", 0, 11, "PASS")
+        journal.close()
+        self.assertEqual(self.journal().replay()[1], {("m", "tc_a", 0): "PASS"})
+
+    def test_truncated_line_after_crash(self):
+        journal = self.journal()
+        journal.plan([("m", "tc_a", 0, 11), ("m", "tc_b", 0, 12)])
+        journal.finish("m", "tc_a", 0, 11, "PASS")
+        journal.close()
+        with open(self.path, "a") as f:
+            f.write('{"event": "finish", "mode": "m", "tc": "tc_b", "run_i')
+
+        # 续跑进程追加的新记录不与半行粘连
+        journal = self.journal()
+        journal.finish("m", "tc_b", 0, 12, "FAIL")
+        journal.close()
+
+        seeds, finished = self.journal().replay()
+        self.assertEqual(seeds, {("m", "tc_a", 0): 11, ("m", "tc_b", 0): 12})
+        self.assertEqual(finished, {("m", "tc_a", 0): "PASS", ("m", "tc_b", 0): "FAIL"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+RuntimeDB 测试：共享同一文件的多个回归先后保存时合并各自新增的记录，不互相覆盖
+"""
+import os
+import sys
+import shutil
+import logging
+import tempfile
+import unittest
+from multiprocessing import Pool
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from runtime_db import RuntimeDB  # noqa: E402
+
+
+def record_and_save(args):
+    path, tc = args
+    db = RuntimeDB(path, logging.getLogger("test_runtime_db"))
+    for duration in range(1, 21):
+        db.record("m", tc, "", float(duration))
+        db.save()
+
+
+class TestRuntimeDB(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix="regr_runtime_db_")
+        self.path = os.path.join(self.tmp_dir, "runtime_db.json")
+        self.logger = logging.getLogger("test_runtime_db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_interleaved_saves_merge(self):
+        first, second = RuntimeDB(self.path, self.logger), RuntimeDB(self.path, self.logger)
+        first.record("m", "tc_a", "", 10.0)
+        second.record("m", "tc_b", "", 20.0)
+        second.record("m", "tc_a", "", 30.0)
+        first.save()
+        second.save()
+
+        records = RuntimeDB(self.path, self.logger).records
+        self.assertEqual(set(records), {"m|tc_a|", "m|tc_b|"})
+        self.assertEqual(records["m|tc_a|"]["count"], 2)
+        self.assertEqual(records["m|tc_a|"]["last"], 30.0)
+        self.assertEqual(records["m|tc_b|"]["count"], 1)
+        # 保存后本地记录与文件一致，再次保存不重复合并
+        self.assertEqual(second.records, records)
+        second.save()
+        self.assertEqual(RuntimeDB(self.path, self.logger).records, records)
+
+    def test_concurrent_processes(self):
+        with Pool(4) as pool:
+            pool.map(record_and_save, [(self.path, f"tc_{i}") for i in range(4)])
+
+        records = RuntimeDB(self.path, self.logger).records
+        self.assertEqual(sorted(records), [f"m|tc_{i}|" for i in range(4)])
+        self.assertTrue(all(entry["count"] == 20 for entry in records.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
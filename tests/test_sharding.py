@@ -0,0 +1,63 @@
+"""
+分片测试：select_shard 结果与输入顺序无关、可重复，N 个分片无重叠且合起来覆盖完整运行列表，规模相差不超过 1
+"""
+import os
+import sys
+import random
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sharding import parse_shard, select_shard, shard_seed  # noqa: E402
+
+
+def run_key(run):
+    return run
+
+
+class TestSharding(unittest.TestCase):
+
+    def setUp(self):
+        self.runs = [(mode, f"tc_{tc}", run_idx) for mode in ("m", "k") for tc in range(7) for run_idx in range(3)]
+
+    def test_deterministic_and_order_independent(self):
+        shuffled = list(self.runs)
+        random.Random(1).shuffle(shuffled)
+        for count in (1, 2, 5):
+            for index in range(1, count + 1):
+                with self.subTest(shard=f"{index}/{count}"):
+                    expected = select_shard(self.runs, (index, count), 42, run_key)
+                    self.assertEqual(select_shard(self.runs, (index, count), 42, run_key), expected)
+                    self.assertEqual(select_shard(shuffled, (index, count), 42, run_key), expected)
+
+    def test_shards_partition_runs(self):
+        for count in (1, 2, 3, 4, 7, len(self.runs), len(self.runs) + 3):
+            with self.subTest(count=count):
+                shards = [select_shard(self.runs, (index, count), 7, run_key) for index in range(1, count + 1)]
+                merged = [run for shard in shards for run in shard]
+                self.assertEqual(len(merged), len(self.runs))
+                self.assertEqual(sorted(merged), sorted(self.runs))
+                sizes = [len(shard) for shard in shards]
+                self.assertLessEqual(max(sizes) - min(sizes), 1)
+
+    def test_random_seed_changes_assignment(self):
+        self.assertNotEqual(select_shard(self.runs, (1, 4), 1, run_key), select_shard(self.runs, (1, 4), 2, run_key))
+
+    def test_shard_seed(self):
+        self.assertEqual(shard_seed(42, "m", "tc_0", 0), shard_seed(42, "m", "tc_0", 0))
+        seeds = {shard_seed(42, mode, tc, run_idx) for mode, tc, run_idx in self.runs}
+        self.assertEqual(len(seeds), len(self.runs))
+        self.assertNotEqual(shard_seed(42, "m", "tc_0", 0), shard_seed(43, "m", "tc_0", 0))
+
+    def test_parse_shard(self):
+        self.assertIsNone(parse_shard(None))
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for text in ("0/4", "5/4", "1/0", "a/b", "2"):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    parse_shard(text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+normalize_signature 测试：同一根因在不同种子、回归目录下的错误行得到相同签名，不同错误保持区分
+"""
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from signature import normalize_signature  # noqa: E402
+
+
+class TestNormalizeSignature(unittest.TestCase):
+
+    def test_examples(self):
+        cases = [
+            ("UVM_ERROR /home/u/run3/tb/s.sv(44) @ 5123ns: [SCB] mismatch 0xdeadbeef",
+             "UVM_ERROR s.sv(<N>) @<T>: [SCB] mismatch <H>"),
+            ("UVM_FATAL ./tb/env.sv(120) @ 0: [CFG] no vif",
+             "UVM_FATAL env.sv(<N>) @<T>: [CFG] no vif"),
+            ("ncsim: *E,ASRTST (../rtl/fifo.sv,88|5): Assertion fifo_ovf failed at 1200 NS",
+             "ncsim: *E,ASRTST (fifo.sv,<N>|<N>): Assertion fifo_ovf failed at <N> NS"),
+            ("Error: data 32'hDEAD_BEEF != 8'b1010_xxxx", "Error: data <H> != <H>"),
+            ("Error: addr deadbeef12 beef", "Error: addr <H> beef"),
+            ("  UVM_ERROR   tb.sv(3)   @ 10.5 ns:  [A]   x  ", "UVM_ERROR tb.sv(<N>) @<T>: [A] x"),
+            ("tb_top.u_dut[3].fifo[12] overflow", "tb_top.u_dut[<N>].fifo[<N>] overflow"),
+            ("Error (a/b) ratio 3/4", "Error (a/b) ratio <N>/<N>"),
+        ]
+        for line, signature in cases:
+            with self.subTest(line=line):
+                self.assertEqual(normalize_signature(line), signature)
+
+    def test_same_root_cause_across_seeds_and_directories(self):
+        lines = [
+            "UVM_ERROR /proj/regr_a/base_fun/tb/scb.sv(44) @ 5123ns: [SCB] mismatch exp=0x1f act=0x2e",
+            "UVM_ERROR /scratch/u/regr_b/base_fun/tb/scb.sv(44) @ 77ns: [SCB] mismatch exp=0xff act=0x00",
+            "UVM_ERROR ../tb/scb.sv(45) @ 1 ps: [SCB] mismatch exp=0x0 act=0x1",
+        ]
+        self.assertEqual(len({normalize_signature(line) for line in lines}), 1)
+
+    def test_different_errors_stay_distinct(self):
+        lines = [
+            "UVM_ERROR /a/tb/scb.sv(44) @ 10ns: [SCB] mismatch",
+            "UVM_ERROR /a/tb/scb.sv(44) @ 10ns: [SCB] timeout",
+            "UVM_ERROR /a/tb/mon.sv(44) @ 10ns: [SCB] mismatch",
+            "UVM_ERROR /a/tb/scb.sv(44) @ 10ns: [MON] mismatch",
+        ]
+        self.assertEqual(len({normalize_signature(line) for line in lines}), len(lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,7 @@
+import os
+import shutil
+import signal
+import asyncio
 import subprocess
 
 def run_shell_command(cmd, return_output=True):
@@ -12,4 +16,40 @@ def run_shell_command(cmd, return_output=True):
         return result.stdout.strip() if return_output else None
     except Exception as e:
         print(f"[ERROR] {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def kill_process_group(process, grace=10):
+    """终止子进程所在的整个进程组（需以 start_new_session=True 启动），先 SIGTERM 再 SIGKILL"""
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            process.wait(timeout=grace)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+async def kill_process_group_async(process, grace=10):
+    """kill_process_group 的 asyncio 版本，process 为 asyncio.subprocess.Process"""
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(process.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            await asyncio.wait_for(process.wait(), grace)
+            return
+        except asyncio.TimeoutError:
+            continue
+
+
+def link_or_copy(src, dst):
+    """优先使用硬链接，跨文件系统时回退为复制（可作为 shutil.copytree 的 copy_function）"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
\ No newline at end of file